@@ -0,0 +1,22 @@
+import numpy as np
+import pytest
+from classes import run_stream_class
+from conftest import stream_tokens
+
+
+def stream_once(client, times_to_first_token, rendered):
+    run_stream = run_stream_class.RunStream(client, "thread_fake", rendered.append)
+    text = run_stream.stream("asst_fake", lambda tool_calls: [{"tool_call_id": tool_call.id, "output": "{}"} for tool_call in tool_calls])
+    times_to_first_token.append(run_stream.time_to_first_token)
+    return text
+
+
+@pytest.mark.parametrize("tool_calls", (None, [("search_naics", {"query": "roofing"})]), ids=("text", "tool_round"))
+def test_stream_run_time_to_first_token(measure, benchmark, fake_client, tool_calls):
+    client = fake_client(first_token_delay=0.02, token_delay=0.001, tool_calls=tool_calls)
+    times_to_first_token, rendered = [], []
+    text = measure(stream_once, client, times_to_first_token, rendered)
+    assert text == "".join(stream_tokens)
+    assert rendered[-1] == text
+    benchmark.extra_info["time_to_first_token_p50_ms"] = float(np.percentile(times_to_first_token, 50) * 1e3)
+    benchmark.extra_info["time_to_first_token_p99_ms"] = float(np.percentile(times_to_first_token, 99) * 1e3)
@@ -0,0 +1,132 @@
+import asyncio
+import json
+import re
+import time
+import pytest
+from openai import OpenAI, AsyncOpenAI
+from classes import client_registry_class
+from new_classes import class_asyncpipeline
+from fake_assistant_server import make_run, make_message
+try:
+    import httpx2 as httpx
+except ImportError:
+    import httpx
+
+
+# Every mocked OpenAI request takes this long, standing in for the round trip to the API
+request_latency = 0.02
+# Content of every message created through the mock, to check the uploaded images were attached
+sent_contents = []
+# Messages in every mocked thread, more than one default page of 20
+thread_message_count = 50
+# Query parameters of every message list request, to count the pages fetched
+list_requests = []
+
+
+def respond(request):
+    path = request.url.path
+    if "/files" in path:
+        return httpx.Response(200, json={"id": "file_fake", "object": "file", "bytes": 3, "created_at": 0, "filename": "upload.png", "purpose": "vision", "status": "processed"})
+    match = re.search(r"/threads/([^/]+)/(messages|runs)", path)
+    thread_id, resource = match.groups()
+    if resource == "runs":
+        return httpx.Response(200, json=make_run("run_fake", thread_id, "queued"))
+    if request.method == "POST":
+        sent_contents.append(json.loads(request.content)["content"])
+        return httpx.Response(200, json=make_message("msg_fake", None, thread_id, "completed", "hello"))
+    list_requests.append(dict(request.url.params))
+    limit = int(request.url.params.get("limit", 20))
+    after = request.url.params.get("after")
+    start = int(after.split("_")[1]) + 1 if after else 0
+    messages = [make_message(f"msg_{index}", "run_fake", thread_id, "completed", "hello") for index in range(start, min(start + limit, thread_message_count))]
+    return httpx.Response(200, json={"object": "list", "data": messages, "first_id": messages[0]["id"], "last_id": messages[-1]["id"], "has_more": start + limit < thread_message_count})
+
+
+def respond_sync(request):
+    time.sleep(request_latency)
+    return respond(request)
+
+
+async def respond_async(request):
+    await asyncio.sleep(request_latency)
+    return respond(request)
+
+
+@pytest.fixture
+def image_paths(tmp_path):
+    paths = []
+    for index in range(3):
+        path = tmp_path / f"image{index}.png"
+        path.write_bytes(b"png")
+        paths.append(str(path))
+    return paths
+
+
+def send_sync(openai_client, image_paths):
+    # The previous CreateMessage and RetrieveMessage path: uploads, message and history fetched one request at a time
+    content = [{"type": "text", "text": "Quote this fleet"}]
+    for image_path in image_paths:
+        file = openai_client.files.create(file=open(file=image_path, mode="rb"), purpose="vision")
+        content.append({"type": "image_file", "image_file": {"file_id": file.id, "detail": "auto"}})
+    thread_message = openai_client.beta.threads.messages.create(thread_id="thread_fake", role="user", content=content)
+    thread_messages = openai_client.beta.threads.messages.list(thread_id="thread_fake").data
+    return thread_message, thread_messages
+
+
+def send_pipeline(chat_pipeline, image_paths):
+    thread_message = chat_pipeline.create_thread_message("thread_fake", "user", "Quote this fleet", None, image_paths)
+    return thread_message, chat_pipeline.get_latest_thread_messages("thread_fake")
+
+
+def test_send_message_sync(measure, image_paths):
+    openai_client = OpenAI(api_key="fake", max_retries=0, http_client=httpx.Client(transport=httpx.MockTransport(respond_sync)))
+    thread_message, thread_messages = measure(send_sync, openai_client, image_paths)
+    assert thread_message.id == "msg_fake" and len(thread_messages) == 20
+
+
+def make_pipeline():
+    return class_asyncpipeline.ChatPipeline(AsyncOpenAI(api_key="fake", max_retries=0, http_client=httpx.AsyncClient(transport=httpx.MockTransport(respond_async))))
+
+
+def test_send_message_pipeline(measure, image_paths):
+    chat_pipeline = make_pipeline()
+    thread_message, thread_messages = measure(send_pipeline, chat_pipeline, image_paths)
+    assert thread_message.id == "msg_fake" and len(thread_messages) == 20
+    assert [part["type"] for part in sent_contents[-1]] == ["text", "image_file", "image_file", "image_file"]
+    chat_pipeline.close().result()
+
+
+def test_latest_messages_single_request(measure):
+    chat_pipeline = make_pipeline()
+    thread_messages = measure(chat_pipeline.get_latest_thread_messages, "thread_fake", "run_fake")
+    assert [thread_message.id for thread_message in thread_messages] == [f"msg_{index}" for index in range(20)]
+    # RetrieveMessage only reads the newest reply, so it fetches one page however long the thread grows
+    del list_requests[:]
+    chat_pipeline.get_latest_thread_messages("thread_fake")
+    assert list_requests == [{"limit": "20", "order": "desc"}]
+    # ChatHistory still follows every page
+    del list_requests[:]
+    assert len(chat_pipeline.get_thread_messages("thread_fake")) == thread_message_count and len(list_requests) == 3
+    chat_pipeline.close().result()
+
+
+def test_retrieve_messages_pipeline(measure):
+    chat_pipeline = make_pipeline()
+    # ChatHistory and RetrieveMessage look up several messages, or the files their annotations cite, in one round trip
+    thread_messages = measure(chat_pipeline.retrieve_thread_messages, "thread_fake", [f"msg_{index}" for index in range(5)])
+    assert len(thread_messages) == 5
+    started_at = time.monotonic()
+    assert [file.id for file in chat_pipeline.retrieve_files(["file_a", "file_b", "file_c"])] == ["file_fake"] * 3
+    assert time.monotonic() - started_at < 3 * request_latency
+    chat_pipeline.close().result()
+
+
+def test_pipeline_closed_on_key_rotation(measure):
+    client_registry = client_registry_class.ClientRegistry()
+    get_pipeline = lambda api_key: client_registry.get_client("chat_pipeline", lambda api_key: make_pipeline(), close=class_asyncpipeline.ChatPipeline.close, api_key=api_key)
+    old_pipeline = get_pipeline("old")
+    assert measure(get_pipeline, "new") is not old_pipeline
+    # The replaced pipeline's loop thread exits instead of running for the life of the process
+    old_pipeline.loop_thread.join(timeout=5)
+    assert not old_pipeline.loop_thread.is_alive() and old_pipeline.loop.is_closed()
+    client_registry.clear()
@@ -0,0 +1,56 @@
+import json
+import pytest
+from classes import code_sandbox_class
+
+
+analysis_code = "claims = pd.DataFrame({'severity': ['High', 'Low', 'Low'], 'paid': [12000, 800, 450]})\ntotal_paid = int(claims['paid'].sum())\nprint(claims.groupby('severity')['paid'].sum().to_dict())"
+
+
+@pytest.fixture(scope="module")
+def code_sandbox():
+    code_sandbox = code_sandbox_class.CodeSandbox(max_workers=2, timeout=2, cpu_seconds=1, memory_bytes=256 * 1024 ** 2, max_bytes=2000)
+    yield code_sandbox
+    code_sandbox.shutdown()
+
+
+def run_in_process(code):
+    # The previous Tools.execute_python_code: exec on the calling thread, which is blocked for as long as the code runs
+    exec_globals = {}
+    exec("import pandas as pd\n" + code, exec_globals)
+    return exec_globals
+
+
+def test_execute_python_in_process(measure):
+    assert measure(run_in_process, analysis_code)["total_paid"] == 13250
+
+
+def test_execute_python_sandbox(measure, code_sandbox):
+    # Warm workers have pandas imported already, so a call costs a round trip over the pipe
+    output = json.loads(measure(code_sandbox.execute, analysis_code))
+    assert output["result"]["total_paid"] == 13250 and output["stdout"] == "{'High': 12000, 'Low': 1250}\n"
+
+
+def test_execute_python_sandbox_limits(measure, code_sandbox):
+    assert json.loads(code_sandbox.execute("while True: pass")) == {"error": "TimeoutError: CPU time limit exceeded", "stdout": ""}
+    assert json.loads(code_sandbox.execute("import time\ntime.sleep(5)")) == {"error": "Code execution timed out after 2 seconds"}
+    assert json.loads(code_sandbox.execute("block = bytearray(512 * 1024 ** 2)"))["error"].startswith("MemoryError")
+    assert code_sandbox.execute("numbers = list(range(10 ** 5))").endswith("[truncated to 2000 bytes]")
+    # The worker killed on the timeout has been replaced
+    assert json.loads(measure(code_sandbox.execute, "x = 1"))["result"] == {"x": 1}
+
+
+def test_execute_python_sandbox_isolation(measure):
+    # One worker, so every call below lands on the worker the previous call used or on its replacement
+    code_sandbox = code_sandbox_class.CodeSandbox(max_workers=1, timeout=5, max_bytes=2000)
+    try:
+        for code in ("pd.DataFrame.sum = lambda self, *args, **kwargs: 0", "pd.set_option('display.max_rows', 5)", "np.seterr(all='raise')", "import statistics\nstatistics.mean = len"):
+            assert "error" not in json.loads(code_sandbox.execute(code))
+        # Each of those calls left its worker changed, so the next session gets a fresh one
+        output = json.loads(code_sandbox.execute(analysis_code + "\nmax_rows = pd.get_option('display.max_rows')\nover = str(np.geterr()['over'])\nloaded = 'statistics' in __import__('sys').modules"))
+        assert output["result"].items() >= {"total_paid": 13250, "max_rows": 60, "over": "warn", "loaded": False}.items()
+        # Ordinary analysis keeps its worker warm
+        worker = code_sandbox.idle_workers.queue[0]
+        measure(code_sandbox.execute, analysis_code)
+        assert code_sandbox.idle_workers.queue[0] is worker
+    finally:
+        code_sandbox.shutdown()
@@ -0,0 +1,117 @@
+import json
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from googlemaps import Client, addressvalidation
+from classes import geocode_batch_class, tool_cache_class
+
+
+# Each validation takes this long to serve, standing in for Google's response time
+validation_latency = 0.01
+location_count = 100
+
+
+def make_schedule(count):
+    # A broker's schedule: every fifth location repeats an earlier one with different case and spacing
+    schedule = []
+    for index in range(count):
+        street = f"{index // 5 * 5 + 1} Main St" if index % 5 == 4 else f"{index + 1} Main St"
+        schedule.append([street.upper() if index % 5 == 4 else street, "Elgin, IL 60124"])
+    return schedule
+
+
+class AddressValidationStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        time.sleep(validation_latency)
+        address_lines = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["address"]["addressLines"]
+        number = int(address_lines[0].split()[0])
+        self.server.requests.append(address_lines)
+        verdict = {"addressComplete": True, "validationGranularity": "PREMISE" if number % 3 else "ROUTE", "hasInferredComponents": number % 2 == 0}
+        result = {"verdict": verdict, "address": {"formattedAddress": ", ".join(address_lines)},
+                  "geocode": {"location": {"latitude": 42.0 + number / 1000, "longitude": -88.3}, "placeId": f"place{number}"}}
+        payload = json.dumps({"result": result}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class StubAdapter(HTTPAdapter):
+    # Sends the client's Address Validation requests to the local stub
+    def __init__(self, base_url):
+        super().__init__(pool_maxsize=16)
+        self.base_url = base_url
+
+    def send(self, request, **kwargs):
+        request.url = request.url.replace("https://addressvalidation.googleapis.com", self.base_url)
+        return super().send(request, **kwargs)
+
+
+@pytest.fixture(scope="module")
+def validation_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), AddressValidationStubHandler)
+    server.daemon_threads = True
+    server.requests = []
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def google_client(validation_server):
+    session = requests.Session()
+    session.mount("https://", StubAdapter(f"http://127.0.0.1:{validation_server.server_address[1]}"))
+    return Client(key="AIzaFakeKeyForTheLocalStub", requests_session=session, queries_per_second=10000, queries_per_minute=600000)
+
+
+@pytest.fixture
+def tool_cache(tmp_path):
+    return tool_cache_class.ToolCache(str(tmp_path / "tool_cache.sqlite3"))
+
+
+def validate_sequential(google_client, schedule):
+    # The previous approach: Tools.validate_address once per location, one request at a time
+    return [addressvalidation.addressvalidation(client=google_client, addressLines=address_lines, regionCode="US", enableUspsCass=True) for address_lines in schedule]
+
+
+def test_validate_addresses_sequential(measure, google_client):
+    assert len(measure(validate_sequential, google_client, make_schedule(location_count), items=location_count)) == location_count
+
+
+def test_geocode_addresses_batch(measure, validation_server, google_client, tool_cache):
+    pipeline = geocode_batch_class.GeocodePipeline(google_client, max_workers=8, tool_cache=tool_cache)
+    schedule = make_schedule(location_count)
+    results_df = measure(lambda: tool_cache.clear() or pipeline.geocode_addresses(schedule), items=location_count)
+    assert len(results_df) == location_count and results_df["error"].isna().all()
+    # Duplicates share their original's result
+    assert results_df.loc[4, "place_id"] == results_df.loc[0, "place_id"] == "place1"
+    assert results_df.loc[0, ["verdict", "confidence"]].tolist() == ["accept", 1.0]
+    assert results_df.loc[1, ["verdict", "confidence"]].tolist() == ["confirm", 0.95]
+    assert results_df.loc[2, ["verdict", "confidence"]].tolist() == ["fix", 0.4]
+    # A cached schedule sends no requests
+    validation_server.requests.clear()
+    pipeline.geocode_addresses(schedule)
+    assert validation_server.requests == []
+    tool_cache.clear()
+    pipeline.geocode_addresses(schedule)
+    assert len(validation_server.requests) == location_count * 4 // 5
+
+
+def test_geocode_addresses_rate_limited(measure, google_client, tool_cache):
+    # 20 distinct addresses at 200 requests/s cannot start in less than 19 request intervals, however many workers there are
+    pipeline = geocode_batch_class.GeocodePipeline(google_client, max_workers=8, queries_per_second=200, tool_cache=tool_cache)
+    started_at = time.monotonic()
+    pipeline.geocode_addresses([[f"{index} Oak Ave", "Elgin, IL 60124"] for index in range(20)])
+    assert time.monotonic() - started_at >= 19 / 200
+    measure(pipeline.geocode_addresses, make_schedule(20), items=20)
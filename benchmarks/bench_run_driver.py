@@ -0,0 +1,80 @@
+import json
+import time
+from types import SimpleNamespace
+import pytest
+from classes import run_driver_class, run_poller_class, tool_executor_class, tool_registry_class
+
+
+fake_tool_registry = tool_registry_class.ToolRegistry()
+
+
+class FakeTools:
+    @fake_tool_registry.tool()
+    def lookup_naics(self, query: str):
+        time.sleep(0.005)
+        return f"NAICS results for {query}"
+
+    @fake_tool_registry.tool()
+    def get_geocode(self, address_lines: list[str]):
+        time.sleep(0.005)
+        return "40.7,-74.0"
+
+    def get_tool_functions(self):
+        return fake_tool_registry.get_tool_functions(self)
+
+
+tool_calls = [("lookup_naics", {"query": "roofing"}), ("get_geocode", {"address_lines": ["1 Main St"]})]
+
+
+def drive_once(client, **budgets):
+    # A fresh poller per run, so the learned durations of earlier rounds do not change what is being timed
+    poller = run_poller_class.RunPoller(initial_delay=0.005)
+    run_driver = run_driver_class.RunDriver(client, "thread_fake", "asst_fake", tool_executor_class.ToolExecutor(FakeTools()), poller=poller, **budgets)
+    run_driver.drive()
+    return run_driver
+
+
+@pytest.mark.parametrize("tool_rounds", (0, 1, 4))
+def test_run_driver_tool_rounds(measure, fake_client, tool_rounds):
+    client = fake_client(first_token_delay=0.01, tool_calls=tool_calls, tool_rounds=tool_rounds)
+    run_driver = measure(drive_once, client)
+    metrics = run_driver.get_metrics()
+    assert run_driver.run.status == "completed" and metrics["stop_reason"] == "completed"
+    assert metrics["tool_rounds"] == tool_rounds and len(run_driver.rounds) == tool_rounds + 1
+    # Each round runs its two tool calls concurrently; a round that slows to two tool latencies shows up against --latency-baseline
+    assert all(latency["tool_calls"] == len(tool_calls) for latency in run_driver.rounds[:-1])
+
+
+@pytest.mark.parametrize("budget, stop_reason", (({"max_rounds": 2}, "round_budget"), ({"max_polls": 4}, "poll_budget"), ({"max_seconds": 0.05}, "time_budget")))
+def test_run_driver_budgets(measure, fake_client, budget, stop_reason):
+    client = fake_client(first_token_delay=0.01, tool_calls=tool_calls, tool_rounds=10)
+    run_driver = measure(lambda: drive_once(client, **budget))
+    assert run_driver.stop_reason == stop_reason and run_driver.run.status == "cancelled"
+    if "max_polls" in budget:
+        # The budget is per run, not per round
+        assert run_driver.get_metrics()["polls"] == budget["max_polls"]
+
+
+def make_tool_call(tool_call_id, name, arguments):
+    return SimpleNamespace(id=tool_call_id, function=SimpleNamespace(name=name, arguments=arguments))
+
+
+def test_tool_executor_bad_arguments(measure):
+    tool_executor = tool_executor_class.ToolExecutor(FakeTools())
+    tool_calls = [make_tool_call("call_json", "lookup_naics", "{not json"), make_tool_call("call_list", "lookup_naics", '["roofing"]'),
+                  make_tool_call("call_extra", "lookup_naics", '{"query": "roofing", "state": "IL"}'), make_tool_call("call_ok", "lookup_naics", '{"query": "roofing"}')]
+    tool_outputs = measure(tool_executor.execute_tool_calls, tool_calls)
+    # Each malformed call reports its own error and the well-formed one still runs
+    assert [tool_output["tool_call_id"] for tool_output in tool_outputs] == ["call_json", "call_list", "call_extra", "call_ok"]
+    assert all("error" in json.loads(tool_output["output"]) for tool_output in tool_outputs[:3])
+    assert "expected a JSON object" in tool_outputs[1]["output"] and tool_outputs[3]["output"] == "NAICS results for roofing"
+    tool_executor.shutdown()
+
+
+def test_tool_executor_timeout_from_start(measure):
+    # Twelve 5ms calls on one worker queue for up to 55ms, well past the 30ms timeout each call gets once it starts
+    tool_executor = tool_executor_class.ToolExecutor(FakeTools(), max_workers=1, timeout=0.03)
+    tool_calls = [make_tool_call(f"call_{index}", "lookup_naics", '{"query": "roofing"}') for index in range(12)]
+    tool_outputs = measure(tool_executor.execute_tool_calls, tool_calls)
+    assert [tool_output["output"] for tool_output in tool_outputs] == ["NAICS results for roofing"] * 12
+    tool_executor.shutdown()
@@ -0,0 +1,195 @@
+import json
+import threading
+import tracemalloc
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import pytest
+import requests
+from requests.adapters import HTTPAdapter
+from simple_salesforce import Salesforce
+from classes import soql_stream_class, salesforce_connector_class
+
+
+page_size = 2000
+account_query = "SELECT Id, Name, Industry, AnnualRevenue, Owner.Name FROM Account WHERE BillingState = 'IL'"
+
+
+def make_account(index):
+    return {"attributes": {"type": "Account", "url": f"/services/data/v59.0/sobjects/Account/001{index:015d}"}, "Id": f"001{index:015d}", "Name": f"Account {index}",
+            "Industry": "Construction", "AnnualRevenue": 1000.0 * index, "BillingStreet": f"{index} Main St", "Description": "Roofing and siding contractor " * 8,
+            "Owner": {"attributes": {"type": "User", "url": "/services/data/v59.0/sobjects/User/005000000000001"}, "Name": "Pat Agent"}}
+
+
+class SalesforceStubHandler(BaseHTTPRequestHandler):
+    # Serves the REST query endpoints in 2,000-record pages and a Bulk API 2.0 query job, over server.total_size accounts
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def send(self, payload, content_type="application/json", headers=None):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_page(self, offset):
+        total_size = self.server.total_size
+        end = min(offset + page_size, total_size)
+        page = {"totalSize": total_size, "done": end >= total_size, "records": [make_account(index) for index in range(offset, end)]}
+        if not page["done"]:
+            page["nextRecordsUrl"] = f"/services/data/v59.0/query/01gQUERY-{end}"
+        self.send(json.dumps(page).encode("utf-8"))
+
+    def session_expired(self):
+        # Sessions in server.expired_sessions are refused as Salesforce refuses a revoked or timed-out session
+        if self.headers.get("Authorization", "").removeprefix("Bearer ") not in self.server.expired_sessions:
+            return False
+        payload = json.dumps([{"message": "Session expired or invalid", "errorCode": "INVALID_SESSION_ID"}]).encode("utf-8")
+        self.send_response(401)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+        return True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        self.server.requests.append(url.path)
+        if self.session_expired():
+            return
+        if url.path.endswith("/query/"):
+            self.send_page(0)
+        elif "/query/01gQUERY-" in url.path:
+            self.send_page(int(url.path.rsplit("-", 1)[1]))
+        elif url.path.endswith("/jobs/query/750JOB/results"):
+            offset = int(parse_qs(url.query).get("locator", ["0"])[0])
+            end = min(offset + int(parse_qs(url.query)["maxRecords"][0]), self.server.total_size)
+            rows = "".join(f'"001{index:015d}","Account {index}","Construction",{1000.0 * index},"Pat Agent"\n' for index in range(offset, end))
+            # A job that matched nothing has an empty results body, without even the header row
+            header = '"Id","Name","Industry","AnnualRevenue","Owner.Name"\n' if self.server.total_size else ""
+            self.send((header + rows).encode("utf-8"), "text/csv",
+                      {"Sforce-Locator": str(end) if end < self.server.total_size else "null", "Sforce-NumberOfRecords": str(end - offset)})
+        elif url.path.endswith("/jobs/query/750JOB"):
+            self.send(json.dumps({"id": "750JOB", "state": "JobComplete"}).encode("utf-8"))
+        else:
+            self.send_error(404)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        self.server.requests.append(self.path)
+        if self.session_expired():
+            return
+        self.send(json.dumps({"id": "750JOB", "state": "UploadComplete"}).encode("utf-8"))
+
+
+class PlainHTTPAdapter(HTTPAdapter):
+    # simple_salesforce always builds https URLs; the stub server speaks plain http
+    def send(self, request, **kwargs):
+        request.url = "http://" + request.url[len("https://"):]
+        return super().send(request, **kwargs)
+
+
+@pytest.fixture(scope="module")
+def salesforce_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SalesforceStubHandler)
+    server.daemon_threads = True
+    server.total_size = 20000
+    server.requests = []
+    server.expired_sessions = set()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def salesforce_client(salesforce_server):
+    salesforce_server.total_size = 20000
+    salesforce_server.requests.clear()
+    session = requests.Session()
+    session.mount("https://", PlainHTTPAdapter())
+    return Salesforce(instance=f"127.0.0.1:{salesforce_server.server_address[1]}", session_id="fake", session=session, version="59.0")
+
+
+def query_all_records(salesforce_client, query):
+    # The previous Tools.execute_soql_query: every record of every page buffered as dicts
+    return salesforce_client.query_all(query)["records"]
+
+
+def peak_bytes(function, *args):
+    tracemalloc.start()
+    try:
+        function(*args)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def test_soql_query_all(measure, salesforce_client):
+    assert len(measure(query_all_records, salesforce_client, account_query, items=20000)) == 20000
+
+
+def test_soql_query_frame(measure, salesforce_client):
+    results_df = measure(lambda: soql_stream_class.query_frame(salesforce_client, account_query), items=20000)
+    assert list(results_df.columns) == ["Id", "Name", "Industry", "AnnualRevenue", "Owner.Name"] and len(results_df) == 20000
+    assert results_df["Owner.Name"].eq("Pat Agent").all() and results_df["AnnualRevenue"].iloc[-1] == 19999000.0
+    # Only the selected fields of the current page are held, not every page's records
+    assert peak_bytes(soql_stream_class.query_frame, salesforce_client, account_query) < peak_bytes(query_all_records, salesforce_client, account_query) / 2
+
+
+def test_soql_iter_records_lazy(measure, salesforce_server, salesforce_client):
+    records = soql_stream_class.iter_records(salesforce_client, "select id, owner.name from Account")
+    assert next(records) == {"id": "001000000000000000", "owner.name": "Pat Agent"}
+    assert len(salesforce_server.requests) == 1
+    assert soql_stream_class.query_frame(salesforce_client, account_query, max_rows=2500).shape == (2500, 5)
+    assert len(salesforce_server.requests) == 3
+    measure(lambda: next(soql_stream_class.iter_records(salesforce_client, account_query)))
+
+
+def test_soql_bulk_query(measure, salesforce_server, salesforce_client):
+    salesforce_server.total_size = 120000
+    results_df = measure(lambda: soql_stream_class.query_frame(salesforce_client, account_query, wait=0), items=120000)
+    assert results_df.shape == (120000, 5) and results_df["Owner.Name"].eq("Pat Agent").all()
+    # Past the threshold only the first REST page is read, to size the query; the rows come from the job's 50,000-row CSV chunks
+    assert sum("/query/01gQUERY-" in path for path in salesforce_server.requests) == 0
+
+
+def test_soql_bulk_query_empty(measure, salesforce_server, salesforce_client):
+    salesforce_server.total_size = 0
+    results_df = measure(lambda: soql_stream_class.bulk_query_frame(salesforce_client, account_query, "Account", ["Id", "Owner.Name"], wait=0))
+    assert results_df.empty and list(results_df.columns) == ["Id", "Owner.Name"]
+
+
+class StubConnector(salesforce_connector_class.SalesforceConnector):
+    # Each login gets a new session id from the stub instead of calling the SOAP login endpoint
+    def __init__(self, port):
+        super().__init__("agent@example.com", "password", "token")
+        self.port = port
+        self.http_session.mount("https://", PlainHTTPAdapter())
+
+    def login(self):
+        self.login_count += 1
+        self.client = Salesforce(instance=f"127.0.0.1:{self.port}", session_id=f"session{self.login_count}", session=self.http_session, version="59.0")
+
+
+def test_soql_connector_expired_session(measure, salesforce_server):
+    salesforce_server.total_size = 120000
+    salesforce_server.expired_sessions.clear()
+    connector = StubConnector(salesforce_server.server_address[1])
+    # Unproxied attributes and probes do not log in
+    assert not hasattr(connector, "bulk2") and connector.login_count == 0
+    assert connector.query(account_query)["totalSize"] == 120000 and connector.login_count == 1
+    # The Bulk API job is retried on a new session, like the REST queries
+    salesforce_server.expired_sessions.add("session1")
+    results_df = soql_stream_class.query_frame(connector, account_query, wait=0)
+    assert results_df.shape == (120000, 5) and connector.login_count == 2
+    salesforce_server.expired_sessions.add("session2")
+    salesforce_server.total_size = 5000
+    chunks = measure(lambda: list(connector.bulk2_query("Account", account_query, wait=0)), items=5000)
+    assert len(chunks) == 1 and chunks[0].startswith('"Id"') and connector.login_count == 3
+    salesforce_server.expired_sessions.clear()
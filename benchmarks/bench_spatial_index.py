@@ -0,0 +1,122 @@
+import os
+import threading
+import numpy as np
+import pytest
+from classes import spatial_index_class
+
+
+location_count = 100000
+# Elgin, IL
+center = (42.0354, -88.2826)
+
+
+def make_locations(count, seed=0):
+    # Insured locations spread over the continental US, a fifth of them clustered around Chicagoland
+    rng = np.random.default_rng(seed)
+    lats = np.where(np.arange(count) % 5 == 0, rng.normal(41.9, 0.3, count), rng.uniform(25.0, 49.0, count))
+    lngs = np.where(np.arange(count) % 5 == 0, rng.normal(-87.9, 0.3, count), rng.uniform(-124.0, -67.0, count))
+    return [f"place{index}" for index in range(count)], lats, lngs
+
+
+@pytest.fixture(scope="module")
+def locations():
+    return make_locations(location_count)
+
+
+@pytest.fixture(scope="module")
+def spatial_index(locations):
+    spatial_index = spatial_index_class.SpatialIndex()
+    ids, lats, lngs = locations
+    spatial_index.add_many(zip(ids, lats, lngs, [""] * len(ids)))
+    return spatial_index
+
+
+def scan_radius(locations, lat, lng, radius_miles):
+    # Without an index: the distance to every location
+    ids, lats, lngs = locations
+    distances = spatial_index_class.haversine_miles(lat, lng, lats, lngs)
+    return np.flatnonzero(distances <= radius_miles)
+
+
+def test_radius_scan(measure, locations):
+    assert len(measure(scan_radius, locations, *center, 5.0)) > 0
+
+
+def test_radius_query(measure, locations, spatial_index):
+    results_df = measure(spatial_index.query_radius, *center, 5.0)
+    assert sorted(results_df["id"]) == sorted(f"place{index}" for index in scan_radius(locations, *center, 5.0))
+    assert results_df["distance_miles"].is_monotonic_increasing and results_df["distance_miles"].max() <= 5.0
+
+
+def test_nearest_query(measure, locations, spatial_index):
+    results_df = measure(spatial_index.query_nearest, 30.0, -100.0, 10)
+    ids, lats, lngs = locations
+    nearest = np.argsort(spatial_index_class.haversine_miles(30.0, -100.0, lats, lngs))[:10]
+    assert results_df["id"].tolist() == [f"place{index}" for index in nearest]
+    # A negative k would otherwise slice off the farthest results instead of failing
+    for k in (0, -1):
+        with pytest.raises(ValueError):
+            spatial_index.query_nearest(30.0, -100.0, k)
+
+
+def test_index_save_load_update(measure, tmp_path, locations, spatial_index):
+    path = str(tmp_path / "spatial_index.npz")
+    spatial_index.save(path)
+    loaded_index = measure(spatial_index_class.SpatialIndex, path)
+    assert len(loaded_index) == location_count
+    assert loaded_index.query_radius(*center, 5.0)["id"].tolist() == spatial_index.query_radius(*center, 5.0)["id"].tolist()
+    # A re-geocoded location moves rather than being indexed twice
+    loaded_index.add("place0", *center, "1840 Coralito Ln, Elgin, IL 60124, USA")
+    loaded_index.add("new", center[0] + 0.0001, center[1], "Next door")
+    assert len(loaded_index) == location_count + 1
+    assert loaded_index.query_nearest(*center, 2)["id"].tolist() == ["place0", "new"]
+
+
+def test_radius_query_across_antimeridian(measure):
+    spatial_index = spatial_index_class.SpatialIndex()
+    spatial_index.add_many([("east", -16.5, 179.95, ""), ("west", -16.5, -179.9, ""), ("far", -16.5, 170.0, "")])
+    # About 7 miles apart, on either side of lng 180
+    assert measure(spatial_index.query_radius, -16.5, -179.95, 10.0)["id"].tolist() == ["west", "east"]
+    assert spatial_index.query_nearest(-16.5, 179.99, 2)["id"].tolist() == ["east", "west"]
+
+
+def save_concurrently(spatial_index, thread_count=8):
+    errors = []
+    barrier = threading.Barrier(thread_count)
+
+    def save():
+        barrier.wait()
+        try:
+            spatial_index.save()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=save) for _ in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return errors
+
+
+def test_index_concurrent_saves(measure, tmp_path, locations):
+    # Tool calls geocode on the ToolExecutor pool, so saves of the shared index overlap
+    path = str(tmp_path / "spatial_index.npz")
+    spatial_index = spatial_index_class.SpatialIndex(path)
+    ids, lats, lngs = locations
+    spatial_index.add_many(zip(ids[:1000], lats[:1000], lngs[:1000], [""] * 1000))
+    assert measure(save_concurrently, spatial_index) == []
+    assert len(spatial_index_class.SpatialIndex(path)) == 1000 and sorted(os.listdir(tmp_path)) == ["spatial_index.npz"]
+
+
+def test_index_scheduled_save(measure, tmp_path):
+    path = str(tmp_path / "spatial_index.npz")
+    spatial_index = spatial_index_class.SpatialIndex(path)
+    for index in range(20):
+        spatial_index.add(f"place{index}", *center, "")
+        spatial_index.schedule_save(delay=60)
+    # What each geocoding tool call pays once a save is pending: twenty additions, one write
+    measure(spatial_index.schedule_save, 60)
+    assert not os.path.exists(path) and spatial_index.save_timer is not None
+    spatial_index.flush()
+    assert len(spatial_index_class.SpatialIndex(path)) == 20 and spatial_index.save_timer is None
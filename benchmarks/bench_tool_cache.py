@@ -0,0 +1,40 @@
+import time
+import pytest
+from classes import tool_cache_class
+
+
+geocode_response = [{"formatted_address": "1840 Coralito Ln, Elgin, IL 60124, USA", "geometry": {"location": {"lat": 42.0, "lng": -88.3}}, "place_id": "fake"}]
+
+
+@pytest.fixture
+def tool_cache(tmp_path):
+    return tool_cache_class.ToolCache(str(tmp_path / "tool_cache.sqlite3"), max_entries=1000, ttls={"get_geocode": {"ttl": 60, "stale": 60}})
+
+
+def test_tool_cache_hit(measure, tool_cache):
+    fetches = []
+    fetch = lambda: fetches.append(1) or geocode_response
+    tool_cache.get_or_fetch("get_geocode", {"address_lines": ["1840 Coralito Ln", "Elgin, IL 60124"]}, fetch)
+    # Differently cased and spaced addresses share the entry
+    response = measure(tool_cache.get_or_fetch, "get_geocode", {"address_lines": ["1840  CORALITO LN", "Elgin, IL 60124 "]}, fetch)
+    assert response == geocode_response and len(fetches) == 1
+    assert tool_cache.get_stats()["get_geocode"]["misses"] == 1
+
+
+def test_tool_cache_miss(measure, tool_cache):
+    addresses = iter(range(10 ** 9))
+    measure(lambda: tool_cache.get_or_fetch("get_geocode", {"address_lines": [f"{next(addresses)} Main St"]}, lambda: geocode_response))
+    assert tool_cache.entry_count <= 1000
+
+
+def test_tool_cache_stale_and_negative(measure, tool_cache):
+    tool_cache.ttls = {"get_geocode": {"ttl": 0.05, "stale": 60}}
+    tool_cache.get_or_fetch("get_geocode", {"address_lines": ["1 Main St"]}, lambda: geocode_response)
+    time.sleep(0.06)
+    # Served from the stale entry at once, while the refresh runs in the background
+    assert tool_cache.get_or_fetch("get_geocode", {"address_lines": ["1 Main St"]}, lambda: time.sleep(0.2) or []) == geocode_response
+    tool_cache.refresh_pool.shutdown(wait=True)
+    # The refresh found nothing; that empty result is now a negative entry and is not fetched again
+    assert measure(tool_cache.get_or_fetch, "get_geocode", {"address_lines": ["1 Main St"]}, lambda: geocode_response) == []
+    tool_stats = tool_cache.get_stats()["get_geocode"]
+    assert tool_stats["stale_hits"] == 1 and tool_stats["misses"] == 1 and tool_stats["hits"] == 0
@@ -0,0 +1,86 @@
+import json
+import random
+import inspect
+import pytest
+from classes import acord_form_class_all, schema_validator_class, tool_registry_class
+from conftest import make_submission
+
+
+def build_registry():
+    tool_registry = tool_registry_class.ToolRegistry()
+
+    class UnderwritingTools:
+        @tool_registry.tool()
+        def get_geocode(self, address_lines: list[str]):
+            """
+            Geocode a US address.
+
+            Parameters:
+            - address_lines (list): The address lines.
+            """
+            return address_lines
+
+        @tool_registry.tool()
+        def find_nearby_locations(self, lat: float, lng: float, radius_miles: float = 5.0):
+            return [lat, lng, radius_miles]
+
+        def underwrite_acord_form(self, form_number, **arguments):
+            return form_number
+
+    for form_number in acord_form_class_all.tool_form_numbers:
+        tool_registry.add_schema(acord_form_class_all.get_form_tool(form_number), "underwrite_acord_form", form_number=form_number)
+    return tool_registry, UnderwritingTools()
+
+
+def test_tool_schemas_built(measure):
+    # Paid once per process, when the Tools module is imported
+    tool_registry, tools = measure(build_registry)
+    schemas = tool_registry.get_schemas()
+    assert [schema["function"]["name"] for schema in schemas[:2]] == ["get_geocode", "find_nearby_locations"] and len(schemas) == 9
+    assert schemas[1]["function"]["parameters"]["required"] == ["lat", "lng"]
+    assert schemas[0]["function"]["parameters"]["properties"]["address_lines"] == {"type": "array", "items": {"type": "string"}, "description": "The address lines."}
+
+
+def test_tool_payload_cached(measure):
+    tool_registry, tools = build_registry()
+    payload = tool_registry.get_payload()
+    # Every assistant update gets the same pre-built string
+    assert measure(tool_registry.get_payload) is payload and json.loads(payload) == tool_registry.get_schemas()
+
+
+def test_tool_dispatch(measure):
+    tool_registry, tools = build_registry()
+    tool_functions = tool_registry.get_tool_functions(tools)
+    assert measure(lambda: tool_functions["underwrite_property_insurance"](business_info={})) == "140"
+    assert tool_functions["find_nearby_locations"](lat=42.0, lng=-88.3) == [42.0, -88.3, 5.0]
+
+
+
+def get_form_mismatches(tool_registry):
+    # Every registered form tool's arguments are passed straight to its form's submit_underwriter_data
+    mismatches = {}
+    for entry in tool_registry.entries.values():
+        if entry["method_name"] != "underwrite_acord_form":
+            continue
+        form_number = entry["arguments"]["form_number"]
+        parameters = entry["schema"]["function"]["parameters"]
+        form_parameters = list(inspect.signature(acord_form_class_all.get_form_class(form_number).submit_underwriter_data).parameters)[1:]
+        if sorted(parameters["properties"]) != sorted(form_parameters) or not set(parameters["required"]) <= set(form_parameters):
+            mismatches[form_number] = (sorted(parameters["properties"]), sorted(form_parameters))
+    return mismatches
+
+
+def test_form_schemas_match_forms(measure):
+    tool_registry, tools = build_registry()
+    assert measure(get_form_mismatches, tool_registry) == {}
+    assert sorted(entry["arguments"]["form_number"] for entry in tool_registry.entries.values() if entry["arguments"]) == sorted(acord_form_class_all.tool_form_numbers)
+
+
+def test_tool_arguments_reject_extra_keys(measure):
+    # An argument the form does not take is reported with the schema errors instead of raising TypeError in submit_underwriter_data
+    arguments = make_submission("140", random.Random(0))
+    form = acord_form_class_all.get_form_class("140")()
+    assert measure(form.submit_tool_arguments, arguments) is None and form.location == arguments["location"]
+    with pytest.raises(schema_validator_class.SchemaValidationError) as error:
+        form.submit_tool_arguments({**arguments, "fleet_size": 3, "requested_coverage": "high"})
+    assert error.value.errors == ["fleet_size: is not allowed", "requested_coverage: expected number"]
@@ -0,0 +1,151 @@
+import time
+import random
+import numpy as np
+import pandas as pd
+import pytest
+from classes import acord_form_class_ind, acord_form_class_batch, rating_table_class
+from conftest import form_numbers, make_submission, make_portfolio, make_columnar_portfolio
+
+
+columnar_form_numbers = ("36", "137")
+
+
+def submitted_form(form_number, **sizes):
+    form = getattr(acord_form_class_ind, f"AccordForm{form_number}")()
+    form.submit_underwriter_data(**make_submission(form_number, random.Random(form_number), **sizes))
+    return form
+
+
+def underwrite_scalar(form_number, submission):
+    # The per-object path every other path is checked against
+    form = getattr(acord_form_class_ind, f"AccordForm{form_number}")()
+    form.submit_underwriter_data(**submission)
+    return form.underwrite()
+
+
+def assert_matches_scalar(results_df, submissions, form_number):
+    for index, submission in submissions:
+        expected = underwrite_scalar(form_number, submission)
+        row = results_df.loc[index]
+        assert (row["decision"], row["risk_score"]) == (expected["decision"], expected["risk_score"]), index
+        assert np.isnan(row["premium_modifier"]) if expected["premium_modifier"] is None else row["premium_modifier"] == expected["premium_modifier"], index
+
+
+def get_scalar_seconds(form_number, submissions, row_count):
+    # Time for the per-object path to score row_count submissions, extrapolated from a sample
+    started = time.perf_counter()
+    for _, submission in submissions:
+        underwrite_scalar(form_number, submission)
+    return (time.perf_counter() - started) / len(submissions) * row_count
+
+
+def make_flat_portfolio(form_number, row_count):
+    # Forms with collections take the count-column layout; the others have no nested arguments to flatten
+    return make_columnar_portfolio(row_count) if form_number in columnar_form_numbers else make_portfolio(form_number, row_count)
+
+
+def get_flat_submission(form_number, row):
+    return get_columnar_submission(row) if form_number in columnar_form_numbers else row.to_dict()
+
+
+def get_columnar_submission(row):
+    # A count-column row expanded back into the claims and safety programs it aggregates
+    claims_history = [{"severity": "High"}] * row["claims_history_high"] + [{"severity": "Medium"}] * row["claims_history_medium"] + [{"severity": "Low"}] * row["claims_history_other"]
+    levels = ["Excellent"] * row["safety_programs_excellent"] + ["Good"] * row["safety_programs_good"] + ["Average"] * row["safety_programs_other"]
+    return {"business_info": {}, "naics_code": row["naics_code"], "number_of_employees": row["number_of_employees"], "total_payroll": row["total_payroll"],
+            "years_in_business": row["years_in_business"], "claims_history": claims_history, "safety_programs": {f"program{index}": level for index, level in enumerate(levels)},
+            "requested_coverage": row["requested_coverage"]}
+
+
+@pytest.mark.parametrize("form_number", form_numbers)
+def test_underwrite_scalar(measure, form_number):
+    form = submitted_form(form_number)
+    result = measure(form.underwrite)
+    assert result == underwrite_scalar(form_number, make_submission(form_number, random.Random(form_number)))
+    assert_matches_scalar(form.underwrite_batch(pd.DataFrame([form.get_submission()])), [(0, make_submission(form_number, random.Random(form_number)))], form_number)
+
+
+@pytest.mark.parametrize("form_number", form_numbers)
+def test_underwrite_cached(measure, form_number):
+    form = submitted_form(form_number)
+    form.underwrite(use_cache=True)
+    assert measure(lambda: form.underwrite(use_cache=True)) == form.underwrite()
+
+
+@pytest.mark.parametrize("form_number", form_numbers)
+def test_underwrite_explain(measure, form_number):
+    form = submitted_form(form_number)
+    result = measure(lambda: form.underwrite(explain=True))
+    contributions = result.pop("contributions")
+    assert result == form.underwrite() and int(np.sum(contributions)) == result["risk_score"]
+
+
+@pytest.mark.parametrize("form_number", ("36", "127", "133", "140"))
+def test_underwrite_large_claims_history(measure, form_number):
+    form = submitted_form(form_number, claim_count=1000)
+    assert measure(form.underwrite) == underwrite_scalar(form_number, make_submission(form_number, random.Random(form_number), claim_count=1000))
+
+
+@pytest.mark.parametrize("fleet_size", (10, 500, 2500))
+def test_underwrite_large_fleet(measure, fleet_size):
+    form = submitted_form("127", fleet_size=fleet_size)
+    result = measure(form.underwrite)
+    # The batch path scores the submitted vehicle and driver dicts rather than the form's fleet arrays
+    results_df = form.underwrite_batch(pd.DataFrame([make_submission("127", random.Random("127"), fleet_size=fleet_size)]))
+    assert (results_df.loc[0, "decision"], results_df.loc[0, "risk_score"]) == (result["decision"], result["risk_score"])
+
+
+@pytest.mark.parametrize("fleet_size", (10, 500, 2500))
+def test_submit_and_underwrite_large_fleet(measure, fleet_size):
+    form = acord_form_class_ind.AccordForm127()
+    submission = make_submission("127", random.Random(fleet_size), fleet_size=fleet_size)
+    assert measure(lambda: form.submit_underwriter_data(**submission) or form.underwrite()) == underwrite_scalar("127", submission)
+
+
+@pytest.mark.parametrize("fleet_size", (500, 2500))
+def test_underwrite_large_fleet_cached(measure, fleet_size):
+    form = submitted_form("127", fleet_size=fleet_size)
+    form.underwrite(use_cache=True)
+    assert measure(lambda: form.underwrite(use_cache=True)) == form.underwrite()
+
+
+def test_calculate_fleet_risk(measure):
+    form = submitted_form("127", fleet_size=2500)
+    fleet_risk = measure(form.calculate_fleet_risk)
+    contributions = form.underwrite(explain=True)["contributions"]
+    # The fleet's points are the explained score's exposure group
+    assert fleet_risk["total"] == contributions[rating_table_class.get_rating_table("127").contribution_groups.index("exposure")]
+    assert len(fleet_risk["vehicles"]) == len(fleet_risk["drivers"]) == 2500
+
+
+@pytest.mark.parametrize("form_number", form_numbers)
+def test_underwrite_batch(measure, request, form_number):
+    portfolio = make_portfolio(form_number, 5000)
+    form = getattr(acord_form_class_ind, f"AccordForm{form_number}")()
+    results_df = measure(form.underwrite_batch, portfolio, items=len(portfolio))
+    assert len(results_df) == len(portfolio)
+    submissions = [(index, portfolio.loc[index].to_dict()) for index in range(0, len(portfolio), 50)]
+    assert_matches_scalar(results_df, submissions, form_number)
+    latency = request.config.latency_results.get(request.node.name)
+    if latency is not None:
+        # Nested books read every dict in Python, so they cannot reach the flat speedup but must still beat the per-object path
+        assert get_scalar_seconds(form_number, submissions, len(portfolio)) / (latency["p50_us"] / 1e6) >= 2
+
+
+def test_underwrite_batch_columnar(measure):
+    portfolio = make_columnar_portfolio(200000)
+    results_df = measure(acord_form_class_ind.AccordForm36().underwrite_batch, portfolio, items=len(portfolio))
+    assert len(results_df) == len(portfolio)
+    assert_matches_scalar(results_df, [(index, get_columnar_submission(portfolio.loc[index])) for index in range(0, len(portfolio), 2000)], "36")
+
+
+@pytest.mark.parametrize("form_number", ("36", "125", "126", "130", "137"))
+def test_underwrite_batch_flat_speedup(measure, request, form_number):
+    # Flat books are the batch fast path and must beat the per-object path over the same rows by 50x
+    portfolio = make_flat_portfolio(form_number, 100000)
+    submissions = [(index, get_flat_submission(form_number, portfolio.loc[index])) for index in range(0, len(portfolio), 50)]
+    results_df = measure(acord_form_class_batch.underwrite_batch, form_number, portfolio, items=len(portfolio))
+    assert_matches_scalar(results_df, submissions[::10], form_number)
+    latency = request.config.latency_results.get(request.node.name)
+    if latency is not None:
+        assert get_scalar_seconds(form_number, submissions, len(portfolio)) / (latency["p50_us"] / 1e6) >= 50
@@ -0,0 +1,79 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import pandas as pd
+import pytest
+import requests
+from classes import yelp_fetcher_class
+
+
+# Each canned page takes this long to serve, standing in for Yelp's response time
+page_latency = 0.02
+
+
+class YelpStubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(page_latency)
+        offset = int(parse_qs(urlsplit(self.path).query)["start"][0])
+        page = {"searchPageProps": {"mainContentComponentsListProps": [{"bizId": f"biz{offset + index}", "name": f"Roofer {offset + index}"} for index in range(20)]}}
+        payload = json.dumps(page).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+@pytest.fixture(scope="module")
+def yelp_url():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), YelpStubHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/search?find_desc={{query}}&find_loc={{postalcode}}&start={{i}}"
+    server.shutdown()
+    server.server_close()
+
+
+def fetch_sequential(base_url, query, postalcode, start_page, num_pages):
+    # The previous Tools.fetch_yelp_data: one unpooled request per page and a pd.concat per row
+    results_df = pd.DataFrame(columns=['URL', 'Response Status', 'Response Text', 'Response JSON'])
+    for i in range(start_page, start_page + num_pages * 20, 20):
+        url = base_url.format(query=query, postalcode=postalcode, i=i)
+        response = requests.get(url, headers=yelp_fetcher_class.default_headers)
+        new_row = pd.DataFrame([{'URL': url, 'Response Status': response.status_code, 'Response Text': response.text, 'Response JSON': response.json()}])
+        results_df = pd.concat([results_df, new_row], ignore_index=True)
+    return results_df
+
+
+def check_pages(results_df, num_pages):
+    assert len(results_df) == num_pages and (results_df["Response Status"] == 200).all()
+    first_ids = [page["searchPageProps"]["mainContentComponentsListProps"][0]["bizId"] for page in results_df["Response JSON"]]
+    assert first_ids == [f"biz{offset}" for offset in range(0, num_pages * 20, 20)]
+
+
+@pytest.mark.parametrize("num_pages", (8, 32))
+def test_fetch_yelp_sequential(measure, yelp_url, num_pages):
+    check_pages(measure(fetch_sequential, yelp_url, "roofing", "60177", 0, num_pages, items=num_pages), num_pages)
+
+
+@pytest.mark.parametrize("num_pages", (8, 32))
+def test_fetch_yelp_concurrent(measure, yelp_url, num_pages):
+    yelp_fetcher = yelp_fetcher_class.YelpFetcher(yelp_url, max_workers=8, requests_per_second=1000)
+    check_pages(measure(yelp_fetcher.fetch_pages, "roofing", "60177", 0, num_pages, items=num_pages), num_pages)
+
+
+def test_fetch_yelp_rate_limited(measure, yelp_url):
+    # 8 pages at 40 requests/s per host cannot finish in less than 7 request intervals, however many workers there are
+    yelp_fetcher = yelp_fetcher_class.YelpFetcher(yelp_url, max_workers=8, requests_per_second=40)
+    started_at = time.monotonic()
+    check_pages(yelp_fetcher.fetch_pages("roofing", "60177", 0, 8), 8)
+    assert time.monotonic() - started_at >= 7 / 40
+    measure(yelp_fetcher.fetch_pages, "roofing", "60177", 0, 8, items=8)
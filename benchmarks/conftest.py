@@ -0,0 +1,166 @@
+# Benchmarks for the underwriting hot path and streamed assistant runs; they run on synthetic data and a local fake
+# event-stream server (fake_assistant_server.py) only, so no OpenAI, Salesforce or Google access is needed.
+#
+#   python -m pytest benchmarks                                              # run and print timings with p50/p99
+#   python -m pytest benchmarks --save-latency-baseline benchmarks/baseline.json
+#   python -m pytest benchmarks --latency-baseline benchmarks/baseline.json  # fail any benchmark whose p50 regressed
+import json
+import random
+import numpy as np
+import pandas as pd
+import pytest
+from openai import OpenAI
+from fake_assistant_server import FakeAssistantServer
+
+
+form_numbers = ("36", "125", "126", "127", "130", "133", "137", "140")
+naics_codes = ("238110", "336111", "484110", "541110", "611110", "622110", "721110", "722511", "445110")
+severities = ("High", "Medium", "Low")
+
+
+def make_claims(rng, count):
+    return [{"year": rng.randint(2000, 2024), "severity": rng.choice(severities)} for _ in range(count)]
+
+
+def make_fleet(rng, count):
+    vehicles = [{"type": rng.choice(("Truck", "Car", "Van", "Heavy Equipment")), "age": rng.randint(0, 15), "value": rng.randint(5000, 90000)} for _ in range(count)]
+    drivers = [{"age": rng.randint(18, 80), "experience": rng.randint(0, 40), "record": rng.choice(("Clean", "Fair", "Poor"))} for _ in range(count)]
+    return vehicles, drivers
+
+
+def make_submission(form_number, rng, claim_count=3, fleet_size=4):
+    """
+    Build one synthetic submit_underwriter_data argument dict.
+
+    Parameters:
+    - form_number (str): The ACORD form number.
+    - rng (random.Random): Seeded generator, so every run scores the same book.
+    - claim_count (int): Length of the claims or loss history.
+    - fleet_size (int): Vehicles and drivers for form 127.
+
+    Returns:
+    - dict: Keyword arguments for the form's submit_underwriter_data.
+    """
+    business_info = {"name": "Synthetic Co", "address": "1 Main St"}
+    naics_code = rng.choice(naics_codes)
+    if form_number in ("36", "137"):
+        return {"business_info": business_info, "naics_code": naics_code, "number_of_employees": rng.randint(1, 1500), "total_payroll": rng.randint(100000, 60000000),
+                "years_in_business": rng.randint(0, 40), "claims_history": make_claims(rng, claim_count),
+                "safety_programs": {"training": rng.choice(("Excellent", "Good", "Average")), "inspections": rng.choice(("Excellent", "Good", "Average"))},
+                "requested_coverage": rng.randint(100000, 12000000)}
+    if form_number == "125":
+        return {"business_info": business_info, "business_type": "Office", "years_in_business": rng.randint(0, 40), "number_of_employees": rng.randint(1, 150),
+                "annual_revenue": rng.randint(10000, 3000000), "prior_claims": rng.randint(0, 5)}
+    if form_number == "126":
+        return {"business_info": business_info, "business_type": rng.choice(("Construction", "Office", "Retail", "Nightclub")), "location": rng.choice(("Urban", "Rural", "Coastal", "Suburban")),
+                "annual_revenue": rng.randint(10000, 8000000), "number_of_employees": rng.randint(1, 200), "years_in_business": rng.randint(0, 40), "prior_claims": rng.randint(0, 5)}
+    if form_number == "127":
+        vehicles, drivers = make_fleet(rng, fleet_size)
+        return {"business_info": business_info, "vehicles": vehicles, "drivers": drivers, "naics_code": naics_code, "annual_revenue": rng.randint(10000, 12000000),
+                "claims_history": make_claims(rng, claim_count), "requested_coverage": rng.randint(100000, 1500000)}
+    if form_number == "130":
+        return {"business_info": business_info, "naics_code": naics_code, "number_of_employees": rng.randint(1, 200), "total_payroll": rng.randint(100000, 12000000),
+                "years_in_business": rng.randint(0, 40), "prior_claims": rng.randint(0, 5), "claim_severity": rng.choice(severities)}
+    if form_number == "133":
+        return {"business_info": business_info, "naics_code": naics_code, "number_of_employees": rng.randint(1, 200), "annual_revenue": rng.randint(10000, 12000000),
+                "claims_history": make_claims(rng, claim_count),
+                "underlying_limits": {"general_liability": rng.choice((500000, 1000000, 2000000)), "auto_liability": rng.choice((500000, 1000000)), "employers_liability": rng.choice((250000, 500000))},
+                "requested_umbrella_limit": rng.randint(1000000, 8000000)}
+    if form_number == "140":
+        return {"business_info": business_info, "location": rng.choice(("Urban", "Rural", "Coastal", "Suburban")),
+                "building_info": {"construction_type": rng.choice(("Frame", "Masonry", "Steel")), "age": rng.randint(0, 90), "square_footage": rng.randint(1000, 90000)},
+                "naics_code": naics_code, "annual_revenue": rng.randint(10000, 12000000), "loss_history": make_claims(rng, claim_count), "requested_coverage": rng.randint(100000, 12000000)}
+    raise ValueError(f"No synthetic submissions for ACORD form {form_number}")
+
+
+def make_portfolio(form_number, row_count, seed=0):
+    rng = random.Random(seed)
+    return pd.DataFrame([make_submission(form_number, rng, claim_count=rng.randint(0, 5), fleet_size=rng.randint(1, 6)) for _ in range(row_count)])
+
+
+def make_columnar_portfolio(row_count, seed=0):
+    # ACORD 36 book with collections pre-aggregated into count columns, the layout warehouse extracts arrive in
+    rng = np.random.default_rng(seed)
+    columns = {"naics_code": rng.choice(naics_codes, row_count), "number_of_employees": rng.integers(1, 1500, row_count), "total_payroll": rng.integers(100000, 60000000, row_count),
+               "years_in_business": rng.integers(0, 40, row_count), "requested_coverage": rng.integers(100000, 12000000, row_count)}
+    for column in ("claims_history_high", "claims_history_medium", "claims_history_other", "safety_programs_excellent", "safety_programs_good", "safety_programs_other"):
+        columns[column] = rng.integers(0, 3, row_count)
+    return pd.DataFrame(columns)
+
+
+stream_tokens = [f"token{index} " for index in range(40)]
+
+
+@pytest.fixture
+def fake_client():
+    # Connects an OpenAI client to a FakeAssistantServer scripted with the given delays and tool calls
+    def connect(**script):
+        server = FakeAssistantServer(stream_tokens, **script).__enter__()
+        servers.append(server)
+        return OpenAI(api_key="fake", base_url=server.base_url, max_retries=0)
+    servers = []
+    yield connect
+    for server in servers:
+        server.__exit__(None, None, None)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("underwriting latency")
+    group.addoption("--latency-baseline", default=None, help="JSON of p50 latencies from --save-latency-baseline to check against")
+    group.addoption("--latency-tolerance", type=float, default=0.25, help="Allowed p50 slowdown over the baseline, as a fraction (default 0.25)")
+    group.addoption("--save-latency-baseline", default=None, help="Write this run's p50/p99 latencies to a JSON file")
+
+
+def pytest_configure(config):
+    config.latency_results = {}
+    baseline_path = config.getoption("latency_baseline")
+    config.latency_baseline = {}
+    if baseline_path:
+        with open(baseline_path) as baseline_file:
+            config.latency_baseline = json.load(baseline_file)
+
+
+def pytest_sessionfinish(session):
+    save_path = session.config.getoption("save_latency_baseline")
+    if save_path and session.config.latency_results:
+        with open(save_path, "w") as baseline_file:
+            json.dump(session.config.latency_results, baseline_file, indent=2, sort_keys=True)
+
+
+@pytest.fixture
+def measure(benchmark, request):
+    """
+    Benchmark a call and record throughput plus p50/p99 latency, failing when p50 regresses past the baseline.
+    Latencies are per benchmark round; fast calls are looped within a round, so their p99 is over round averages.
+
+    Parameters:
+    - function: The call to time, with its positional arguments after it.
+    - items (int): Submissions scored per call, for throughput.
+
+    Returns:
+    - The result of the benchmarked call.
+    """
+    def run(function, *args, items=1):
+        result = benchmark(function, *args)
+        if benchmark.stats is None:
+            # --benchmark-disable runs the call once untimed; the behaviour assertions still apply
+            return result
+        timings = np.asarray(benchmark.stats.stats.data)
+        p50, p99 = np.percentile(timings, 50), np.percentile(timings, 99)
+        benchmark.extra_info.update({"p50_us": p50 * 1e6, "p99_us": p99 * 1e6, "submissions_per_second": items / p50})
+        config = request.config
+        config.latency_results[request.node.name] = {"p50_us": p50 * 1e6, "p99_us": p99 * 1e6, "submissions_per_second": items / p50}
+        baseline = config.latency_baseline.get(request.node.name)
+        allowed = baseline["p50_us"] * (1 + config.getoption("latency_tolerance")) if baseline else None
+        if allowed is not None and p50 * 1e6 > allowed:
+            pytest.fail(f"p50 {p50 * 1e6:.1f}us exceeds baseline {baseline['p50_us']:.1f}us by more than the tolerance")
+        return result
+    return run
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    if not config.latency_results:
+        return
+    terminalreporter.section("underwriting latency")
+    for name, latency in sorted(config.latency_results.items()):
+        terminalreporter.write_line(f"{name:<50} p50 {latency['p50_us']:>10.1f}us   p99 {latency['p99_us']:>10.1f}us   {latency['submissions_per_second']:>12,.0f} submissions/s")
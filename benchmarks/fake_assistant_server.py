@@ -0,0 +1,153 @@
+# A local stand-in for the Assistants run endpoints, serving scripted runs as server-sent event streams or as
+# run objects to poll. Point an OpenAI client at FakeAssistantServer.base_url to exercise runs without network access.
+import itertools
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def make_run(run_id, thread_id, status, tool_calls=None):
+    run = {"id": run_id, "object": "thread.run", "created_at": int(time.time()), "thread_id": thread_id, "assistant_id": "asst_fake", "status": status,
+           "instructions": "", "model": "fake", "tools": [], "parallel_tool_calls": True, "tool_choice": "auto", "truncation_strategy": {"type": "auto"}}
+    if tool_calls:
+        run["required_action"] = {"type": "submit_tool_outputs", "submit_tool_outputs": {"tool_calls": [
+            {"id": f"call_{index}", "type": "function", "function": {"name": name, "arguments": json.dumps(arguments)}} for index, (name, arguments) in enumerate(tool_calls)]}}
+    return run
+
+
+def make_message(message_id, run_id, thread_id, status, text=None):
+    content = [{"type": "text", "text": {"value": text, "annotations": []}}] if text is not None else []
+    return {"id": message_id, "object": "thread.message", "created_at": int(time.time()), "thread_id": thread_id, "run_id": run_id, "assistant_id": "asst_fake",
+            "role": "assistant", "status": status, "content": content, "attachments": [], "metadata": {}}
+
+
+class FakeAssistantRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out as separate writes; with Nagle's algorithm each response would wait on a delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append((self.command, self.path, None))
+        match = re.fullmatch(r"/v1/threads/([^/]+)/runs/([^/]+)", self.path)
+        if match is None or match.group(2) not in self.server.runs:
+            self.send_error(404)
+            return
+        self.send_json(self.server.get_run(match.group(1), match.group(2)))
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        server = self.server
+        server.requests.append((self.command, self.path, body))
+        match = re.fullmatch(r"/v1/threads/([^/]+)/runs(?:/([^/]+)/(submit_tool_outputs|cancel))?", self.path)
+        if match is None:
+            self.send_error(404)
+            return
+        thread_id, run_id, action = match.groups()
+        if action == "cancel":
+            server.runs[run_id]["status"] = "cancelled"
+            self.send_json(server.get_run(thread_id, run_id))
+            return
+        run_id = server.start_round(run_id)
+        if not body.get("stream"):
+            self.send_json(make_run(run_id, thread_id, "queued"))
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        if server.runs[run_id]["round"] < server.tool_rounds:
+            self.send_tool_round(thread_id, run_id)
+        else:
+            self.send_response_round(thread_id, run_id)
+        self.send_event("done", "[DONE]")
+        self.close_connection = True
+
+    def send_json(self, data):
+        payload = json.dumps(data).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def send_event(self, event, data):
+        payload = data if isinstance(data, str) else json.dumps(data)
+        self.wfile.write(f"event: {event}\ndata: {payload}\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+    def send_tool_round(self, thread_id, run_id):
+        self.send_event("thread.run.created", make_run(run_id, thread_id, "queued"))
+        self.send_event("thread.run.in_progress", make_run(run_id, thread_id, "in_progress"))
+        time.sleep(self.server.first_token_delay)
+        self.send_event("thread.run.requires_action", make_run(run_id, thread_id, "requires_action", self.server.tool_calls))
+
+    def send_response_round(self, thread_id, run_id):
+        server = self.server
+        self.send_event("thread.run.created", make_run(run_id, thread_id, "queued"))
+        self.send_event("thread.run.in_progress", make_run(run_id, thread_id, "in_progress"))
+        self.send_event("thread.message.created", make_message("msg_fake", run_id, thread_id, "in_progress"))
+        time.sleep(server.first_token_delay)
+        for index, token in enumerate(server.tokens):
+            if index:
+                time.sleep(server.token_delay)
+            self.send_event("thread.message.delta", {"id": "msg_fake", "object": "thread.message.delta", "delta": {"content": [{"index": 0, "type": "text", "text": {"value": token}}]}})
+        self.send_event("thread.message.completed", make_message("msg_fake", run_id, thread_id, "completed", "".join(server.tokens)))
+        self.send_event("thread.run.completed", make_run(run_id, thread_id, "completed"))
+
+
+class FakeAssistantServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, tokens, first_token_delay=0.0, token_delay=0.0, tool_calls=None, tool_rounds=None):
+        """
+        Serve scripted runs on a free local port.
+
+        Parameters:
+        - tokens (list): Text deltas the assistant message is streamed as.
+        - first_token_delay (float): Seconds each model step takes before its first token (or tool call), standing in for model latency.
+        - token_delay (float): Seconds between tokens.
+        - tool_calls (list, optional): (name, arguments) pairs the run requires before it answers.
+        - tool_rounds (int, optional): How many times the run requires those tool calls; one when tool_calls is given.
+        """
+        super().__init__(("127.0.0.1", 0), FakeAssistantRequestHandler)
+        self.tokens = list(tokens)
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.tool_calls = tool_calls
+        self.tool_rounds = (1 if tool_calls else 0) if tool_rounds is None else tool_rounds
+        self.runs = {}
+        self.run_ids = itertools.count()
+        self.requests = []
+        self.base_url = f"http://127.0.0.1:{self.server_address[1]}/v1"
+
+    def start_round(self, run_id):
+        # A new run starts at round 0; each submission of tool outputs starts the next model step
+        if run_id is None:
+            run_id = f"run_fake{next(self.run_ids)}"
+            self.runs[run_id] = {"round": 0, "started_at": time.monotonic(), "status": None}
+        else:
+            self.runs[run_id].update(round=self.runs[run_id]["round"] + 1, started_at=time.monotonic())
+        return run_id
+
+    def get_run(self, thread_id, run_id):
+        state = self.runs[run_id]
+        if state["status"] is not None:
+            return make_run(run_id, thread_id, state["status"])
+        if time.monotonic() - state["started_at"] < self.first_token_delay + self.token_delay * len(self.tokens):
+            return make_run(run_id, thread_id, "in_progress")
+        if state["round"] < self.tool_rounds:
+            return make_run(run_id, thread_id, "requires_action", self.tool_calls)
+        return make_run(run_id, thread_id, "completed")
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+        self.server_close()
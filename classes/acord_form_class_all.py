@@ -1,22 +1,43 @@
+import importlib
 import streamlit as st
 from enum import Enum
 #from classes.acord_form_class_ind import AccordForm36, AccordForm125, AccordForm126, AccordForm127, AccordForm130, AccordForm133, AccordForm137, AccordForm140
-from classes import acord_form_class_ind
 
 
-class AcordForms:
-    def __init__(self):
-        self.Form_36 = acord_form_class_ind.AccordForm36()
-        self.Form_125 = acord_form_class_ind.AccordForm125()
-        self.Form_126 = acord_form_class_ind.AccordForm126()
-        self.Form_127= acord_form_class_ind.AccordForm127()
-        self.Form_130 = acord_form_class_ind.AccordForm130()
-        self.Form_133 = acord_form_class_ind.AccordForm133()
-        self.Form_137 = acord_form_class_ind.AccordForm137()
-        self.Form_140 = acord_form_class_ind.AccordForm140()
+# Form_<number> attributes served by AcordForms
+form_numbers = ("36", "125", "126", "127", "130", "133", "137", "140")
+# Forms served as assistant tools. The ACORD 137 schema asks for a commercial auto fleet while AccordForm137 and its
+# rating table take workers' compensation fields, so it stays unregistered until the two agree
+tool_form_numbers = ("36", "125", "126", "127", "130", "133", "140")
+
+
+def get_form_class(form_number):
+    # classes.acord_form_class_ind (and the rating engine it pulls in) is only imported once a form is first used
+    return getattr(importlib.import_module("classes.acord_form_class_ind"), f"AccordForm{form_number}")
+
 
+def get_form_tool(form_number):
+    """
+    Get a form's assistant tool schema without loading the form classes or the rating engine.
 
-a = AcordForms()
-b = a.Form_125.form_data
-print(b)
+    Parameters:
+    - form_number (str): The ACORD form number, e.g. "125".
+
+    Returns:
+    - dict: The form's function tool definition from assets/acord.
+    """
+    return getattr(importlib.import_module(f"assets.acord.acord_form_{form_number}"), f"acord_form_{form_number}_tool")
+
+
+class AcordForms:
+    def __getattr__(self, name):
+        # Only reached for forms this instance has not created yet; each one is built on first access and then kept
+        form_number = name.removeprefix("Form_")
+        if form_number == name or form_number not in form_numbers:
+            raise AttributeError(f"{type(self).__name__} has no attribute {name}")
+        form = get_form_class(form_number)()
+        setattr(self, name, form)
+        return form
 
+    def get_form_tools(self):
+        return [get_form_tool(form_number) for form_number in tool_form_numbers]
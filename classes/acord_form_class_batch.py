@@ -0,0 +1,48 @@
+import pandas as pd
+from classes import rating_table_class
+
+
+def underwrite_batch(form_number, data, explain=False):
+    """
+    Underwrite a whole book of submissions for one ACORD form in a single vectorized pass.
+
+    Parameters:
+    - form_number (str): The ACORD form number, e.g. "36" or "127".
+    - data (pd.DataFrame | dict): One row per submission, with columns named after the form's submit_underwriter_data arguments.
+      Nested arguments may instead arrive flattened, the fast path for large books since no dict is read per row:
+      "<parent>_<key>" for dict fields (building_info_age), "<items>_<category>" counts plus "<items>_other" for category
+      collections (claims_history_high) and "<items>_<key>" for minimums (underlying_limits_general_liability).
+    - explain (bool): Also return one "<group>_points" column per contribution group, collected in the same pass.
+
+    Returns:
+    - pd.DataFrame: Columns decision, risk_score and premium_modifier (NaN where the per-object path returns None).
+    """
+    rating_table = rating_table_class.get_rating_table(form_number)
+    if explain:
+        contributions = rating_table.calculate_batch_contributions(data)
+        risk_scores = contributions.sum(axis=1, dtype="int64")
+    else:
+        risk_scores = rating_table.calculate_risk_scores(data)
+    decision, risk_scores, premium_modifier = rating_table.decide_batch(risk_scores)
+    index = data.index if isinstance(data, pd.DataFrame) else None
+    columns = {"decision": decision, "risk_score": risk_scores, "premium_modifier": premium_modifier}
+    if explain:
+        columns.update((f"{group}_points", contributions[:, group_index]) for group_index, group in enumerate(rating_table.contribution_groups))
+    return pd.DataFrame(columns, index=index)
+
+
+def sweep_breakpoint(form_number, data, factor_name, thresholds, breakpoint_index=0):
+    """
+    Show how a book's decisions shift as one rating breakpoint moves across a grid of candidates.
+
+    Parameters:
+    - form_number (str): The ACORD form number, e.g. "36".
+    - data (pd.DataFrame | dict): One row per submission, as for underwrite_batch.
+    - factor_name (str): The bands factor to sweep, e.g. "payroll".
+    - thresholds (array-like): Candidate breakpoint values.
+    - breakpoint_index (int): Which of the factor's breakpoints to move, e.g. 1 for the 20,000,000 payroll tier on form 36.
+
+    Returns:
+    - pd.DataFrame: Decision counts, decisions_changed, mean_risk_score and average_premium_modifier per threshold.
+    """
+    return rating_table_class.get_rating_table(form_number).sweep_breakpoint(data, factor_name, thresholds, breakpoint_index)
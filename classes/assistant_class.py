@@ -3,7 +3,12 @@ from openai import OpenAI
 import time
 import json
 from tavily import TavilyClient
-from classes.tools_class2 import Tools
+from classes.tools_class2 import Tools, tool_registry
+from classes import run_stream_class, tool_executor_class, run_driver_class
+from masterclasses import client_class
+
+# The tools JSON each assistant was last updated with in this process, by assistant id
+updated_tool_payloads = {}
 
 class Assistant():
     def __init__(self):
@@ -11,9 +16,11 @@ class Assistant():
         self.initialize_tools()
         self.initialize_messages()
         self.assistant_tools = Tools()
+        self.tool_executor = tool_executor_class.ToolExecutor(self.assistant_tools)
         
     def initialize_openai(self):
-        self.client = OpenAI(api_key=st.secrets.openai.api_key)
+        # Shared process-wide; an optional base_url secret points it at another endpoint, e.g. a local fake event-stream server
+        self.client = client_class.get_openai_client()
         self.thread_id = st.session_state.user_data.thread_id
         self.vector_store_id = st.session_state.user_data.vector_store_id
         self.assistant_id = st.secrets.openai.assistant_id
@@ -22,7 +29,14 @@ class Assistant():
     def initialize_tools(self):
         self.tools_code_interpreter = {"type": "code_interpreter"}
         self.tools_file_search = {"type": "file_search"} 
-        self.tools_functions = []
+        self.tools_functions = tool_registry.get_schemas()
+
+    def update_assistant_tools(self):
+        # The function schemas are built and serialized once per process, so an unchanged tool set is not sent again
+        tools_payload = tool_registry.get_payload()
+        if updated_tool_payloads.get(self.assistant_id) != tools_payload:
+            self.client.beta.assistants.update(self.assistant_id, tools=[self.tools_code_interpreter, self.tools_file_search, *self.tools_functions])
+            updated_tool_payloads[self.assistant_id] = tools_payload
         
     def initialize_messages(self):
         self.existing_thread_messages = self.client.beta.threads.messages.list(thread_id=self.thread_id, order="desc")
@@ -57,40 +71,52 @@ class Assistant():
     def create_run(self):
         self.run = self.client.beta.threads.runs.create(thread_id=self.thread_id, assistant_id=self.assistant_id)
         self.run_id = self.run.id
-        self.run_status = self.run_status
+        self.run_status = self.run.status
         
     def retrieve_run(self):
         self.run = self.client.beta.threads.runs.retrieve(run_id=self.run_id, thread_id=self.thread_id)
         self.run_status = self.run.status
         
     def wait_on_run(self):
-        while self.run_status != "completed":
-            time.sleep(2)
-            self.retrieve_run()
-            if self.run_status == "completed": 
-                self.get_thread_messages()
-                self.get_response_messages()
-                break
-            elif self.run.status == "requires_action":
-                self.tool_calls = self.run.required_action.submit_tool_outputs.tool_calls
-                self.requires_action_type = self.run.required_action.type # should be submit tool outputs
-                self.submit_tool_outputs()
-                if self.tool_outputs:
-                    self.retrieve_run()
-                
+        # Polls adaptively through every tool round; self.run_driver.rounds records model and tool latency per round
+        self.run_driver = run_driver_class.RunDriver(self.client, self.thread_id, self.assistant_id, self.tool_executor)
+        self.run = self.run_driver.drive(self.run)
+        self.run_status = self.run.status
+        self.run_polls = self.run_driver.get_metrics()["polls"]
+        if self.run_status == "completed":
+            self.get_thread_messages()
+            self.get_response_messages()
+
+    def stream_run(self, placeholder=None):
+        """
+        Run the assistant over the run event stream instead of polling, handling tool calls as the run asks for them.
+
+        Parameters:
+        - placeholder (st.empty, optional): Chat element the response is rendered into as tokens arrive, e.g. an
+          st.empty() inside st.chat_message("assistant"); without one the response is only returned.
+
+        Returns:
+        - str: The assistant's response text.
+        """
+        render = placeholder.markdown if placeholder is not None else None
+        self.run_stream = run_stream_class.RunStream(self.client, self.thread_id, render)
+        self.assistant_message_content = self.run_stream.stream(self.assistant_id, self.handle_tool_calls)
+        self.run = self.run_stream.run
+        self.run_id = self.run.id
+        self.run_status = self.run.status
+        self.stream_metrics = self.run_stream.get_metrics()
+        self.display_messages.append({"role": "assistant", "content": self.assistant_message_content})
+        self.existing_messages.append({"role": "assistant", "content": self.assistant_message_content})
+        return self.assistant_message_content
+
+    def handle_tool_calls(self, tool_calls):
+        self.tool_calls = tool_calls
+        self.submit_tool_outputs()
+        return self.tool_outputs
+
     def submit_tool_outputs(self):
-        self.tool_outputs = []
-        for tool_call in self.tool_calls:
-            tool_name = tool_call.function.name
-            tool_args = json.loads(tool_call.function.arguments)
-            tool_id = tool_call.id
-            
-            # Dynamically call the tool method if it exists in the Tools class
-            if hasattr(self.assistant_tools, tool_name):
-                tool_method = getattr(self.assistant_tools, tool_name)
-                tool_output = tool_method(**tool_args)
-                tool_call_output = {"tool_call_id": tool_id, "output": tool_output}
-                self.tool_outputs.append(tool_call_output)
+        # Tool calls of one step run concurrently; outputs come back in call order, with errors reported per call
+        self.tool_outputs = self.tool_executor.execute_tool_calls(self.tool_calls)
 
 # Instantiate the Assistant class
 assistant = Assistant()
\ No newline at end of file
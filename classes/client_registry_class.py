@@ -0,0 +1,54 @@
+import hashlib
+import threading
+
+
+class ClientRegistry:
+    def __init__(self):
+        self.clients = {}
+        self.locks = {}
+        self.lock = threading.Lock()
+
+    def get_client(self, name, factory, close=None, **credentials):
+        """
+        Get the process-wide client registered under a name, building it on first use or when its credentials change.
+
+        Parameters:
+        - name (str): The registry entry; each name must always be given credentials from the same secrets.
+        - factory (function): Builds the client from the credentials as keyword arguments.
+        - close (function, optional): Called with the client when it is replaced or cleared, e.g. to stop its threads.
+        - credentials: The current credentials, read from st.secrets by the caller.
+
+        Returns:
+        - The shared client.
+        """
+        fingerprint = hashlib.blake2b(repr(sorted(credentials.items())).encode("utf-8"), digest_size=16).hexdigest()
+        entry = self.clients.get(name)
+        if entry is not None and entry[0] == fingerprint:
+            return entry[1]
+        with self.lock:
+            name_lock = self.locks.setdefault(name, threading.Lock())
+        # Locked per name, so a slow Salesforce login does not hold up the other clients
+        replaced = None
+        with name_lock:
+            entry = self.clients.get(name)
+            if entry is None or entry[0] != fingerprint:
+                replaced, entry = entry, (fingerprint, factory(**credentials), close)
+                self.clients[name] = entry
+        if replaced is not None:
+            self.close_client(replaced)
+        return entry[1]
+
+    def close_client(self, entry):
+        fingerprint, client, close = entry
+        if close is not None:
+            close(client)
+
+    def clear(self):
+        with self.lock:
+            entries, self.clients = list(self.clients.values()), {}
+        for entry in entries:
+            self.close_client(entry)
+
+
+# Shared by every session in the process; rotated secrets are picked up on the next get_*_client call
+client_registry = ClientRegistry()
@@ -0,0 +1,206 @@
+import io
+import math
+import queue
+import sys
+import types
+import signal
+import builtins
+import warnings
+import resource
+import importlib
+import contextlib
+import multiprocessing
+from functools import lru_cache
+from classes import tool_output_class
+
+
+# Imported by every worker before it takes code, and available to the code as np and pd
+preload_modules = {"np": "numpy", "pd": "pandas"}
+
+
+def get_address_space():
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[0]) * resource.getpagesize()
+
+
+def cpu_time_exceeded(signum, frame):
+    raise TimeoutError("CPU time limit exceeded")
+
+
+def get_variables(namespace):
+    # The names the code defined, without the preloaded modules, imports, functions and classes
+    return {name: value for name, value in namespace.items() if not name.startswith("_") and not isinstance(value, (types.ModuleType, types.FunctionType, type))}
+
+
+def get_options(options):
+    values = {}
+    for name in dir(options):
+        value = getattr(options, name)
+        values[name] = get_options(value) if type(value) is type(options) else value
+    return values
+
+
+def get_module_state(preloaded):
+    """
+    Fingerprint the process state that outlives a call's namespace, since workers serve every session in turn.
+
+    Parameters:
+    - preloaded (dict): The preloaded modules by alias.
+
+    Returns:
+    - tuple: The loaded modules' ids by name; the ids of the attributes of builtins, the preloaded modules and their classes;
+      and the pandas options and numpy error and print settings.
+    """
+    attributes = {}
+    for module in [builtins, *preloaded.values()]:
+        for name, value in vars(module).items():
+            # Submodules are skipped, since the libraries import some lazily on first use
+            if isinstance(value, types.ModuleType):
+                continue
+            attributes[(module.__name__, name)] = id(value)
+            if isinstance(value, type):
+                for member_name, member in vars(value).items():
+                    attributes[(module.__name__, name, member_name)] = id(member)
+    with warnings.catch_warnings():
+        # Reading deprecated pandas options warns
+        warnings.simplefilter("ignore")
+        options = get_options(preloaded["pd"].options)
+    modules = {name: id(module) for name, module in list(sys.modules.items())}
+    return modules, attributes, options, preloaded["np"].geterr(), preloaded["np"].get_printoptions()
+
+
+def is_clean(module_state, new_module_state):
+    # Unchanged, apart from submodules of already loaded packages; a new package or a replaced module counts as a change
+    modules, *settings = module_state
+    new_modules, *new_settings = new_module_state
+    if settings != new_settings or any(new_modules.get(name) != module_id for name, module_id in modules.items()):
+        return False
+    return all(name.partition(".")[0] in modules for name in new_modules.keys() - modules.keys())
+
+
+def run_worker(connection, cpu_seconds, memory_bytes, max_bytes):
+    """
+    Run submitted code in a fresh namespace, one call at a time, until the connection closes.
+
+    Parameters:
+    - connection (Connection): Receives code strings and sends back each JSON result with whether the worker is still clean.
+    - cpu_seconds (int): CPU time allowed per call.
+    - memory_bytes (int): Address space allowed on top of the preloaded modules.
+    - max_bytes (int): Largest JSON result sent back.
+    """
+    preloaded = {alias: importlib.import_module(module_name) for alias, module_name in preload_modules.items()}
+    resource.setrlimit(resource.RLIMIT_AS, (get_address_space() + memory_bytes, resource.RLIM_INFINITY))
+    signal.signal(signal.SIGXCPU, cpu_time_exceeded)
+    module_state = get_module_state(preloaded)
+    connection.send("ready")
+    while True:
+        try:
+            code = connection.recv()
+        except EOFError:
+            return
+        # RLIMIT_CPU counts the process's whole lifetime, so each call's limit starts from the CPU time used so far
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        resource.setrlimit(resource.RLIMIT_CPU, (math.ceil(usage.ru_utime + usage.ru_stime) + cpu_seconds, resource.RLIM_INFINITY))
+        namespace = dict(preloaded)
+        stdout = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(stdout):
+                exec(code, namespace)
+            result = {"result": get_variables(namespace), "stdout": stdout.getvalue()}
+        except (Exception, SystemExit) as e:
+            result = {"error": f"{type(e).__name__}: {e}", "stdout": stdout.getvalue()}
+        finally:
+            resource.setrlimit(resource.RLIMIT_CPU, (resource.RLIM_INFINITY, resource.RLIM_INFINITY))
+        try:
+            output = tool_output_class.truncate_chunks(tool_output_class.iter_json(result), max_bytes)[0]
+        except Exception as e:
+            output = tool_output_class.encoder.encode({"error": f"Result could not be serialized: {type(e).__name__}: {e}"})
+        # Code that imported modules, patched them or changed their settings would leak into later calls, so its worker is replaced
+        connection.send((output, is_clean(module_state, get_module_state(preloaded))))
+
+
+class SandboxWorker:
+    def __init__(self, context, cpu_seconds, memory_bytes, max_bytes):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=run_worker, args=(child_connection, cpu_seconds, memory_bytes, max_bytes), name="code-sandbox", daemon=True)
+        self.process.start()
+        child_connection.close()
+        self.ready = False
+
+    def wait_ready(self, timeout):
+        if not self.ready:
+            if not self.connection.poll(timeout):
+                raise TimeoutError(f"Sandbox worker did not start within {timeout} seconds")
+            self.connection.recv()
+            self.ready = True
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+class CodeSandbox:
+    def __init__(self, max_workers=2, timeout=30, cpu_seconds=20, memory_bytes=1024 ** 3, max_bytes=16000, start_timeout=60):
+        """
+        Run model-generated Python in a warm pool of worker processes, away from the Streamlit server.
+
+        Parameters:
+        - max_workers (int): Worker processes kept running; calls beyond them wait for a free worker.
+        - timeout (float): Wall-clock seconds a call may take before its worker is killed and replaced.
+        - cpu_seconds (int): CPU seconds a call may use, enforced in the worker with RLIMIT_CPU.
+        - memory_bytes (int): Memory a worker may allocate beyond its preloaded modules, enforced with RLIMIT_AS.
+        - max_bytes (int): Largest JSON result returned.
+        - start_timeout (float): Seconds a new worker may take to import its preloaded modules.
+        """
+        self.timeout = timeout
+        self.worker_args = (cpu_seconds, memory_bytes, max_bytes)
+        self.start_timeout = start_timeout
+        # Spawned rather than forked, since the server process has threads running
+        self.context = multiprocessing.get_context("spawn")
+        self.idle_workers = queue.Queue()
+        for _ in range(max_workers):
+            self.idle_workers.put(SandboxWorker(self.context, *self.worker_args))
+
+    def execute(self, code):
+        """
+        Run code in a worker and return its variables and printed output.
+
+        Parameters:
+        - code (str): The Python code to be executed.
+
+        Returns:
+        - str: JSON of the variables the code defined and what it printed, or of the error, capped at max_bytes.
+        """
+        worker = self.idle_workers.get()
+        try:
+            worker.wait_ready(self.start_timeout)
+            worker.connection.send(code)
+            if worker.connection.poll(self.timeout):
+                output, clean = worker.connection.recv()
+                if clean:
+                    self.idle_workers.put(worker)
+                else:
+                    self.replace_worker(worker)
+                return output
+            error = f"Code execution timed out after {self.timeout} seconds"
+        except (EOFError, OSError, TimeoutError) as e:
+            # The worker died, e.g. killed past its hard limits, or never started
+            error = f"Code execution failed: {type(e).__name__}: {e}" if str(e) else "Code execution failed: the worker exited"
+        self.replace_worker(worker)
+        return tool_output_class.encoder.encode({"error": error})
+
+    def replace_worker(self, worker):
+        # The new worker imports its modules in the background and is waited for when next taken
+        worker.kill()
+        self.idle_workers.put(SandboxWorker(self.context, *self.worker_args))
+
+    def shutdown(self):
+        while not self.idle_workers.empty():
+            self.idle_workers.get().kill()
+
+
+@lru_cache(maxsize=None)
+def get_code_sandbox():
+    # Started on the first execute_python_code call and shared by every session in the process
+    return CodeSandbox()
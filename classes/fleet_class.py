@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+
+
+# Field defaults match the .get() fallbacks the ACORD 127 rating table uses for missing vehicle and driver details
+vehicle_dtype = np.dtype([("type", "U32"), ("age", "f8"), ("value", "f8")])
+driver_dtype = np.dtype([("age", "f8"), ("experience", "f8"), ("record", "U16")])
+vehicle_defaults = {"type": "", "age": 0, "value": 0}
+driver_defaults = {"age": 0, "experience": 0, "record": "Clean"}
+# Below this many units NumPy's per-call overhead outweighs vectorizing a collection on the per-submission path
+vectorize_min_units = 128
+
+
+def to_structured_array(records, dtype, defaults):
+    # Filled one field at a time; building a tuple per record costs several times more for large fleets
+    units = np.empty(len(records), dtype=dtype)
+    for field in dtype.names:
+        default = defaults[field]
+        units[field] = [record.get(field, default) for record in records]
+    return units
+
+
+class Fleet:
+    def __init__(self, vehicles, drivers):
+        self.vehicles = vehicles
+        self.drivers = drivers
+
+    @classmethod
+    def from_records(cls, vehicles, drivers):
+        """
+        Build a fleet from the vehicle and driver dicts submitted with ACORD 127.
+
+        Parameters:
+        - vehicles (list): Dicts with type, age and value.
+        - drivers (list): Dicts with age, experience and record.
+
+        Returns:
+        - Fleet: The fleet backed by structured NumPy arrays.
+        """
+        if isinstance(vehicles, np.ndarray) and isinstance(drivers, np.ndarray):
+            return cls(vehicles, drivers)
+        return cls(to_structured_array(vehicles, vehicle_dtype, vehicle_defaults), to_structured_array(drivers, driver_dtype, driver_defaults))
+
+    def get_units(self, items, records):
+        units = getattr(self, items)
+        return units if len(units) >= vectorize_min_units else records
+
+    def calculate_risk(self, rating_table):
+        """
+        Score every vehicle and driver in one vectorized pass per factor.
+
+        Parameters:
+        - rating_table (RatingTable): The compiled ACORD 127 rating table.
+
+        Returns:
+        - dict: "vehicles" and "drivers" DataFrames with one points column per factor plus risk_points, and the fleet "total".
+        """
+        fleet_risk = {"total": 0}
+        for items, units in (("vehicles", self.vehicles), ("drivers", self.drivers)):
+            columns = {field: units[field] for field in units.dtype.names}
+            risk_points = np.zeros(len(units), dtype=np.int64)
+            for factor in rating_table.factors:
+                if factor.items == items:
+                    columns[factor.name] = factor.batch_points_for(units[factor.key])
+                    risk_points += columns[factor.name]
+            columns["risk_points"] = risk_points
+            fleet_risk[items] = pd.DataFrame(columns)
+            fleet_risk["total"] += int(risk_points.sum())
+        return fleet_risk
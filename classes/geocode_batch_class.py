@@ -0,0 +1,122 @@
+import pandas as pd
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+from googlemaps import addressvalidation
+from classes import tool_cache_class, rate_limiter_class
+
+
+# Confidence an address starts from at each Address Validation granularity; coarser matches than these score 0
+granularity_confidence = {"SUB_PREMISE": 1.0, "PREMISE": 1.0, "PREMISE_PROXIMITY": 0.8, "BLOCK": 0.6, "ROUTE": 0.4, "OTHER": 0.2}
+# Deducted from the confidence for each verdict flag Google sets, and for an incomplete address
+verdict_penalties = {"hasUnconfirmedComponents": 0.3, "hasReplacedComponents": 0.1, "hasInferredComponents": 0.05}
+incomplete_penalty = 0.3
+result_columns = ["address", "formatted_address", "lat", "lng", "place_id", "verdict", "confidence", "error"]
+
+
+def get_address_lines(address):
+    if isinstance(address, str):
+        return [address]
+    return [str(line) for line in address if pd.notna(line) and str(line).strip()]
+
+
+def score_validation(response):
+    """
+    Turn an Address Validation response into a verdict and a confidence score.
+
+    Parameters:
+    - response (dict): The validateAddress response.
+
+    Returns:
+    - tuple: The verdict, following Google's guidance ("accept", "confirm" with the insured, or "fix"), and a confidence from 0 to 1.
+    """
+    verdict = response.get("result", {}).get("verdict", {})
+    granularity = verdict.get("validationGranularity")
+    flags = [flag for flag in verdict_penalties if verdict.get(flag)]
+    confidence = granularity_confidence.get(granularity, 0.0) - sum(verdict_penalties[flag] for flag in flags)
+    if not verdict.get("addressComplete"):
+        confidence -= incomplete_penalty
+    if not verdict.get("addressComplete") or granularity_confidence.get(granularity, 0.0) < granularity_confidence["BLOCK"]:
+        decision = "fix"
+    elif flags or granularity not in ("PREMISE", "SUB_PREMISE"):
+        decision = "confirm"
+    else:
+        decision = "accept"
+    return decision, round(min(max(confidence, 0.0), 1.0), 2)
+
+
+class GeocodePipeline:
+    def __init__(self, google_client, max_workers=8, queries_per_second=None, tool_cache=None):
+        """
+        Validate and geocode many addresses at once, calling Google only for addresses that are not cached.
+
+        Parameters:
+        - google_client (googlemaps.Client): The client for the Address Validation API.
+        - max_workers (int): Requests in flight at once.
+        - queries_per_second (float, optional): Request starts allowed per second; defaults to the client's own quota.
+        - tool_cache (ToolCache, optional): The response cache, shared with Tools.validate_address; defaults to the process cache.
+        """
+        self.google_client = google_client
+        self.tool_cache = tool_cache or tool_cache_class.get_tool_cache()
+        self.rate_limiter = rate_limiter_class.HostRateLimiter(queries_per_second or getattr(google_client, "queries_quota", 50))
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="geocode")
+
+    def validate(self, address_lines):
+        def fetch():
+            # Only cache misses spend the quota
+            self.rate_limiter.wait("addressvalidation")
+            return addressvalidation.addressvalidation(client=self.google_client, addressLines=address_lines, regionCode="US", enableUspsCass=True)
+        return self.tool_cache.get_or_fetch("validate_address", {"address_lines": address_lines}, fetch)
+
+    def geocode_address(self, address_lines):
+        # The validation response carries the geocode too, so one request per address covers both
+        try:
+            response = self.validate(address_lines)
+        except Exception as e:
+            return {"verdict": "fix", "confidence": 0.0, "error": str(e)}
+        decision, confidence = score_validation(response)
+        result = response.get("result", {})
+        geocode = result.get("geocode", {})
+        location = geocode.get("location", {})
+        return {"formatted_address": result.get("address", {}).get("formattedAddress"), "lat": location.get("latitude"), "lng": location.get("longitude"),
+                "place_id": geocode.get("placeId"), "verdict": decision, "confidence": confidence, "error": None}
+
+    def geocode_addresses(self, addresses):
+        """
+        Validate and geocode a schedule of addresses, once per distinct address.
+
+        Parameters:
+        - addresses (list): Each address as a string or a list of address lines.
+
+        Returns:
+        - DataFrame: One row per address, in order, with its formatted address, lat, lng, place_id, verdict, confidence and any error.
+        """
+        address_lines = [get_address_lines(address) for address in addresses]
+        # Addresses differing only in case and spacing are validated once
+        keys = [tuple(tool_cache_class.normalize(lines)) for lines in address_lines]
+        unique_lines = {}
+        for key, lines in zip(keys, address_lines):
+            unique_lines.setdefault(key, lines)
+        futures = {key: self.pool.submit(self.geocode_address, lines) for key, lines in unique_lines.items()}
+        rows = {key: future.result() for key, future in futures.items()}
+        return pd.DataFrame([dict(rows[key], address=", ".join(lines)) for key, lines in zip(keys, address_lines)], columns=result_columns)
+
+    def geocode_frame(self, locations_df, address_columns):
+        """
+        Add the geocoding columns to a schedule of locations.
+
+        Parameters:
+        - locations_df (DataFrame): The locations, e.g. a broker's ACORD 140 schedule.
+        - address_columns (list): The columns that make up each address, in line order.
+
+        Returns:
+        - DataFrame: The locations joined with formatted_address, lat, lng, place_id, verdict, confidence and error.
+        """
+        results_df = self.geocode_addresses(locations_df[address_columns].values.tolist()).drop(columns="address")
+        results_df.index = locations_df.index
+        return locations_df.join(results_df)
+
+
+@lru_cache(maxsize=None)
+def get_geocode_pipeline(google_client):
+    # One pool and rate limiter per client, so concurrent sessions share the client's quota
+    return GeocodePipeline(google_client)
@@ -0,0 +1,148 @@
+import os
+import struct
+import tomllib
+import hashlib
+import tempfile
+import numpy as np
+from functools import lru_cache
+
+
+naics_classes_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "rating", "naics_risk_classes.toml")
+naics_index_path = os.path.join(os.path.dirname(naics_classes_path), "naics_index.bin")
+
+# Packed layout: header, class names, then the trie as int32 children[node_count, 10] and uint8 node_class[node_count]
+index_magic = b"NAICSIX1"
+index_header = struct.Struct("<8s32sII")
+max_code_length = 6
+
+
+def build_trie(prefixes, class_names):
+    # Node 0 is the root; a child pointer of 0 means "no child" because nothing points back at the root
+    children = [[0] * 10]
+    node_class = [0]
+    for prefix, class_name in prefixes.items():
+        if not (prefix.isdigit() and 2 <= len(prefix) <= max_code_length):
+            raise ValueError(f"NAICS prefix must be 2 to 6 digits: {prefix}")
+        node = 0
+        for digit in prefix:
+            digit = int(digit)
+            if children[node][digit] == 0:
+                children[node][digit] = len(children)
+                children.append([0] * 10)
+                node_class.append(0)
+            node = children[node][digit]
+        node_class[node] = class_names.index(class_name) + 1
+    return np.array(children, dtype=np.int32), np.array(node_class, dtype=np.uint8)
+
+
+def write_naics_index(source_path=naics_classes_path, index_path=naics_index_path):
+    with open(source_path, "rb") as source_file:
+        content = source_file.read()
+    prefixes = tomllib.loads(content.decode("utf-8"))["prefixes"]
+    class_names = sorted(set(prefixes.values()))
+    children, node_class = build_trie(prefixes, class_names)
+    class_blob = "\n".join(class_names).encode("utf-8")
+    header = index_header.pack(index_magic, hashlib.sha256(content).digest(), len(node_class), len(class_blob))
+    padding = b"\0" * (-(len(header) + len(class_blob)) % 4)
+    # Written to a temporary file and renamed so concurrent Streamlit processes never map a half-written index
+    index_directory = os.path.dirname(index_path)
+    with tempfile.NamedTemporaryFile(dir=index_directory, delete=False) as index_file:
+        index_file.write(header + class_blob + padding + children.tobytes() + node_class.tobytes())
+    os.chmod(index_file.name, 0o644)
+    os.replace(index_file.name, index_path)
+
+
+class NaicsIndex:
+    def __init__(self, class_names, children, node_class):
+        self.class_names = class_names
+        self.children = children
+        self.node_class = node_class
+        self.get_risk_class_id = lru_cache(maxsize=4096)(self.find_risk_class_id)
+
+    @classmethod
+    def from_file(cls, index_path=naics_index_path):
+        with open(index_path, "rb") as index_file:
+            magic, digest, node_count, class_blob_length = index_header.unpack(index_file.read(index_header.size))
+            class_names = index_file.read(class_blob_length).decode("utf-8").split("\n")
+        if magic != index_magic:
+            raise ValueError(f"Not a NAICS index file: {index_path}")
+        offset = index_header.size + class_blob_length
+        offset += -offset % 4
+        children = np.memmap(index_path, dtype=np.int32, mode="r", offset=offset, shape=(node_count, 10))
+        node_class = np.memmap(index_path, dtype=np.uint8, mode="r", offset=offset + children.nbytes, shape=(node_count,))
+        index = cls(class_names, children, node_class)
+        index.digest = digest
+        return index
+
+    def find_risk_class_id(self, naics_code):
+        # Walks one trie level per digit and keeps the deepest node that carries a class (longest-prefix match)
+        node, risk_class_id = 0, 0
+        for character in naics_code[:max_code_length]:
+            if not "0" <= character <= "9":
+                break
+            node = int(self.children[node, ord(character) - 48])
+            if node == 0:
+                break
+            risk_class_id = int(self.node_class[node]) or risk_class_id
+        return risk_class_id
+
+    def get_risk_class(self, naics_code):
+        """
+        Look up the industry risk class for a NAICS code by longest matching prefix.
+
+        Parameters:
+        - naics_code (str): A 2 to 6 digit NAICS code; longer strings are matched on their first six characters.
+
+        Returns:
+        - str | None: The risk class name, or None when no prefix matches.
+        """
+        risk_class_id = self.get_risk_class_id(naics_code)
+        return self.class_names[risk_class_id - 1] if risk_class_id else None
+
+    def get_risk_class_ids(self, naics_codes):
+        """
+        Vectorized longest-prefix lookup over an array of NAICS codes.
+
+        Parameters:
+        - naics_codes (array-like of str): The NAICS codes.
+
+        Returns:
+        - np.ndarray: Risk class ids (0 where no prefix matches), indexing 1-based into class_names.
+        """
+        codes = np.char.encode(np.asarray(naics_codes, dtype=f"U{max_code_length}"), "ascii", "replace").astype(f"S{max_code_length}")
+        digits = codes.view(np.uint8).reshape(-1, max_code_length).astype(np.int16) - 48
+        node = np.zeros(len(codes), dtype=np.int32)
+        alive = np.ones(len(codes), dtype=bool)
+        risk_class_ids = np.zeros(len(codes), dtype=np.uint8)
+        for depth in range(max_code_length):
+            digit = digits[:, depth]
+            alive &= (digit >= 0) & (digit <= 9)
+            node = np.where(alive, self.children[node, np.clip(digit, 0, 9)], 0)
+            alive &= node > 0
+            node_class = self.node_class[node]
+            risk_class_ids = np.where(alive & (node_class > 0), node_class, risk_class_ids)
+        return risk_class_ids
+
+
+def load_naics_index(source_path=naics_classes_path, index_path=naics_index_path):
+    with open(source_path, "rb") as source_file:
+        digest = hashlib.sha256(source_file.read()).digest()
+    try:
+        index = NaicsIndex.from_file(index_path)
+        if index.digest == digest:
+            return index
+    except (OSError, ValueError, struct.error):
+        pass
+    try:
+        write_naics_index(source_path, index_path)
+        return NaicsIndex.from_file(index_path)
+    except OSError:
+        # Read-only deployments still get the index, just built in memory instead of mapped from disk
+        with open(source_path, "rb") as source_file:
+            prefixes = tomllib.loads(source_file.read().decode("utf-8"))["prefixes"]
+        class_names = sorted(set(prefixes.values()))
+        return NaicsIndex(class_names, *build_trie(prefixes, class_names))
+
+
+# Built once per process at import and shared by every form class and the batch path
+naics_index = load_naics_index()
@@ -0,0 +1,24 @@
+import threading
+import time
+
+
+class HostRateLimiter:
+    def __init__(self, requests_per_second):
+        """
+        Space out request starts per host, across every thread sharing the limiter.
+
+        Parameters:
+        - requests_per_second (float): Request starts allowed per host.
+        """
+        self.interval = 1.0 / requests_per_second
+        self.next_request_at = {}
+        self.lock = threading.Lock()
+
+    def wait(self, host):
+        # Each caller reserves the next free slot for its host, then sleeps outside the lock until that slot
+        with self.lock:
+            now = time.monotonic()
+            request_at = max(now, self.next_request_at.get(host, now))
+            self.next_request_at[host] = request_at + self.interval
+        if request_at > now:
+            time.sleep(request_at - now)
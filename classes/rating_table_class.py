@@ -0,0 +1,551 @@
+import os
+import time
+import tomllib
+import hashlib
+import numpy as np
+import pandas as pd
+from bisect import bisect_left, bisect_right
+from itertools import chain
+from operator import itemgetter, methodcaller
+from classes.naics_index_class import naics_index
+
+
+rating_tables_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "rating", "rating_tables.toml")
+
+# Compiled rating tables keyed by file path, recompiled only when the file's mtime changes
+compiled_rating_tables = {}
+# Seconds between mtime checks, so hot scoring loops do not stat the file on every call
+mtime_check_interval = 1.0
+
+
+def get_column(data, name):
+    if isinstance(data, pd.DataFrame):
+        return data[name].to_numpy()
+    return np.asarray(data[name])
+
+
+def get_labels(data, name):
+    # String columns stay as pandas objects so they can be factorized without materialising every value in Python
+    if isinstance(data, pd.DataFrame):
+        return data[name]
+    return np.asarray(data[name], dtype=object)
+
+
+def has_column(data, name):
+    if isinstance(data, pd.DataFrame):
+        return name in data.columns
+    return name in data
+
+
+def get_row_count(data):
+    if isinstance(data, pd.DataFrame):
+        return len(data.index)
+    return len(next(iter(data.values())))
+
+
+def get_column_name(*parts):
+    return "_".join(str(part).lower().replace(" ", "_") for part in parts)
+
+
+def flatten_column(column):
+    # Flattens a column of lists (or dicts, by value) into a row index per item plus the items themselves
+    lengths = np.fromiter(map(len, column), dtype=np.int64, count=len(column))
+    rows = np.repeat(np.arange(len(column)), lengths)
+    value_types = set(map(type, column))
+    if value_types == {np.ndarray}:
+        # Structured arrays (e.g. ACORD 127 fleets) concatenate into one structured array without touching each item
+        return rows, np.concatenate(column)
+    if dict in value_types:
+        # Dict views are made and dropped one at a time, since keeping one per row alive triggers full garbage collections
+        column = (value.values() if isinstance(value, dict) else value for value in column)
+    return rows, list(chain.from_iterable(column))
+
+
+def sum_by_row(rows, points, row_count):
+    return np.bincount(rows, weights=points, minlength=row_count).astype(np.int64)
+
+
+def lookup_points(values, points_for_value, default_points):
+    # Scores each distinct value once and broadcasts the points back to every row
+    codes, uniques = pd.factorize(values)
+    unique_points = np.array([points_for_value(value) for value in uniques] + [default_points], dtype=np.int64)
+    return unique_points[codes]
+
+
+def band_points(values, breakpoints, points):
+    # Equivalent to an if/elif cascade over "value > breakpoint" from the top band down, summed as steps from the lowest band
+    risk_points = np.full(len(values), points[0], dtype=np.int64)
+    for breakpoint, step in zip(breakpoints, np.diff(points)):
+        risk_points += (values > breakpoint) * step
+    return risk_points
+
+
+def lower_band_points(values, breakpoints, points):
+    # Equivalent to an if/elif cascade over "value < breakpoint" from the bottom band up, summed as steps from the highest band
+    risk_points = np.full(len(values), points[-1], dtype=np.int64)
+    for breakpoint, step in zip(breakpoints, -np.diff(points)):
+        risk_points += (values < breakpoint) * step
+    return risk_points
+
+
+class BatchColumns:
+    def __init__(self, data):
+        self.data = data
+        self.row_count = get_row_count(data)
+        self.flattened_items = {}
+        self.item_values = {}
+
+    def get_items(self, items):
+        # Several factors can score the same collection, e.g. vehicle type, age and value, so it is flattened once
+        if items not in self.flattened_items:
+            self.flattened_items[items] = flatten_column(get_column(self.data, items))
+        return self.flattened_items[items]
+
+    def get_item_values(self, factor):
+        # Each field is pulled out of a collection's items once, with one C-level map rather than a Python call per item,
+        # and shared by factors that score it twice, e.g. the young and senior driver age bands
+        cache_key = (factor.items, factor.key, factor.missing, factor.labels)
+        if cache_key not in self.item_values:
+            rows, items = self.get_items(factor.items)
+            if isinstance(items, np.ndarray):
+                values = items[factor.key]
+            else:
+                if factor.key is None:
+                    values = items
+                elif factor.has_missing:
+                    values = list(map(methodcaller("get", factor.key, factor.missing), items))
+                else:
+                    values = list(map(itemgetter(factor.key), items))
+                values = np.array(values, dtype=object if factor.labels else None)
+            self.item_values[cache_key] = rows, values
+        return self.item_values[cache_key]
+
+
+class RatingFactor:
+    labels = False
+
+    def __init__(self, spec):
+        self.name = spec["name"]
+        self.kind = spec["kind"]
+        self.group = spec["group"]
+        self.items = spec.get("items")
+        self.field = spec.get("field")
+        self.has_missing = "missing" in spec
+        self.missing = spec.get("missing")
+        self.when_positive = spec.get("when_positive")
+        self.parent, self.key = self.field.split(".", 1) if self.field and "." in self.field else (None, self.field)
+
+    def read_batch_values(self, data):
+        read_column = get_labels if self.labels else get_column
+        if self.parent is None:
+            return read_column(data, self.key)
+        flat_name = get_column_name(self.parent, self.key)
+        if has_column(data, flat_name):
+            return read_column(data, flat_name)
+        values = map(methodcaller("get", self.key, self.missing), get_column(data, self.parent))
+        return np.array(list(values), dtype=object if self.labels else None)
+
+    def compile_points_for(self):
+        return self.points_for
+
+    def compile_calculate_points(self):
+        # Builds a closure specialised to this factor's shape, so the scalar path does no per-call branching
+        points_for = self.compile_points_for()
+        key, parent, missing, items_key = self.key, self.parent, self.missing, self.items
+        if parent is not None:
+            read_value = lambda source: source[parent].get(key, missing)
+        elif self.has_missing:
+            read_value = lambda source: source.get(key, missing)
+        else:
+            read_value = lambda source: source[key]
+
+        if items_key is None:
+            calculate_points = lambda submission: points_for(read_value(submission))
+        elif key is None:
+            def calculate_points(submission):
+                items = submission[items_key]
+                return sum(map(points_for, items.values() if isinstance(items, dict) else items))
+        else:
+            batch_points_for = self.batch_points_for
+            def calculate_points(submission):
+                items = submission[items_key]
+                if isinstance(items, np.ndarray):
+                    # Structured arrays (e.g. ACORD 127 fleets) are scored in one vectorized pass
+                    return int(batch_points_for(items[key]).sum())
+                return sum(map(points_for, map(read_value, items.values() if isinstance(items, dict) else items)))
+
+        if self.when_positive is None:
+            return calculate_points
+        when_positive, score_points = self.when_positive, calculate_points
+        return lambda submission: score_points(submission) if submission[when_positive] > 0 else 0
+
+    def calculate_batch_points(self, columns):
+        if self.items is None:
+            risk_points = self.batch_points_for(self.read_batch_values(columns.data))
+        else:
+            risk_points = self.aggregated_batch_points(columns)
+            if risk_points is None:
+                rows, values = columns.get_item_values(self)
+                risk_points = sum_by_row(rows, self.batch_points_for(values), columns.row_count)
+        if self.when_positive is not None:
+            risk_points = np.where(get_column(columns.data, self.when_positive) > 0, risk_points, 0)
+        return risk_points
+
+    def aggregated_batch_points(self, columns):
+        # Overridden by factors whose collections can also be supplied as pre-aggregated columns
+        return None
+
+
+class BandsFactor(RatingFactor):
+    def __init__(self, spec):
+        super().__init__(spec)
+        self.breakpoints = list(spec["breakpoints"])
+        self.points = list(spec["points"])
+        self.compare = spec.get("compare", ">")
+        if len(self.points) != len(self.breakpoints) + 1:
+            raise ValueError(f"Rating factor {self.name} needs one more points entry than breakpoints")
+        if self.compare not in (">", "<"):
+            raise ValueError(f"Rating factor {self.name} has unknown compare {self.compare}")
+
+    def points_for(self, value):
+        if self.compare == ">":
+            return self.points[bisect_left(self.breakpoints, value)]
+        return self.points[bisect_right(self.breakpoints, value)]
+
+    def compile_points_for(self):
+        points, breakpoints = self.points, self.breakpoints
+        bisect = bisect_left if self.compare == ">" else bisect_right
+        return lambda value: points[bisect(breakpoints, value)]
+
+    def batch_points_for(self, values):
+        if self.compare == ">":
+            return band_points(values, self.breakpoints, self.points)
+        return lower_band_points(values, self.breakpoints, self.points)
+
+
+class CategoryFactor(RatingFactor):
+    labels = True
+
+    def __init__(self, spec):
+        super().__init__(spec)
+        self.table = dict(spec["points"])
+        self.default = spec.get("default", 0)
+
+    def points_for(self, value):
+        return self.table.get(value, self.default)
+
+    def batch_points_for(self, values):
+        return lookup_points(values, self.points_for, self.default)
+
+    def aggregated_batch_points(self, columns):
+        # Collections may be supplied as "<items>_<category>" count columns plus "<items>_other" for everything else
+        count_columns = {category: get_column_name(self.items, category) for category in self.table}
+        if not all(has_column(columns.data, name) for name in count_columns.values()):
+            return None
+        risk_points = np.zeros(columns.row_count, dtype=np.int64)
+        for category, name in count_columns.items():
+            risk_points = risk_points + get_column(columns.data, name) * self.table[category]
+        other_name = get_column_name(self.items, "other")
+        if has_column(columns.data, other_name):
+            risk_points = risk_points + get_column(columns.data, other_name) * self.default
+        return risk_points
+
+
+class NaicsFactor(RatingFactor):
+    labels = True
+
+    def __init__(self, spec):
+        super().__init__(spec)
+        self.table = dict(spec["points"])
+        self.default = spec.get("default", 0)
+        unknown_classes = set(self.table) - set(naics_index.class_names)
+        if unknown_classes:
+            raise ValueError(f"Rating factor {self.name} uses unknown NAICS risk classes: {sorted(unknown_classes)}")
+        # Points per risk class id, with id 0 (no matching prefix) scoring the default
+        self.class_points = np.array([self.default] + [self.table.get(name, self.default) for name in naics_index.class_names], dtype=np.int64)
+
+    def points_for(self, value):
+        return int(self.class_points[naics_index.get_risk_class_id(value)])
+
+    def compile_points_for(self):
+        class_points, get_risk_class_id = self.class_points.tolist(), naics_index.get_risk_class_id
+        return lambda value: class_points[get_risk_class_id(value)]
+
+    def batch_points_for(self, values):
+        codes, uniques = pd.factorize(values)
+        unique_points = self.class_points[naics_index.get_risk_class_ids(uniques)]
+        return np.append(unique_points, self.default)[codes]
+
+
+class PerUnitFactor(RatingFactor):
+    def __init__(self, spec):
+        super().__init__(spec)
+        self.rate = spec["points"]
+
+    def points_for(self, value):
+        return value * self.rate if value > 0 else 0
+
+    def batch_points_for(self, values):
+        return np.where(values > 0, values * self.rate, 0)
+
+
+class MinimumsFactor(RatingFactor):
+    def __init__(self, spec):
+        super().__init__(spec)
+        self.minimums = dict(spec["minimums"])
+        self.points = spec["points"]
+
+    def calculate_points(self, submission):
+        return sum(self.points for key, value in submission[self.items].items() if value < self.minimums.get(key, 0))
+
+    def compile_calculate_points(self):
+        return self.calculate_points
+
+    def calculate_batch_points(self, columns):
+        # Items may be supplied flattened as "<items>_<key>" columns, NaN where the key is absent
+        flat_names = {key: get_column_name(self.items, key) for key in self.minimums}
+        if any(has_column(columns.data, name) for name in flat_names.values()):
+            shortfalls = np.zeros(columns.row_count, dtype=np.int64)
+            for key, name in flat_names.items():
+                if has_column(columns.data, name):
+                    shortfalls += get_column(columns.data, name) < self.minimums[key]
+            return shortfalls * self.points
+        items = get_column(columns.data, self.items)
+        rows = np.repeat(np.arange(columns.row_count), [len(value) for value in items])
+        pairs = chain.from_iterable(value.items() for value in items)
+        shortfall = np.array([value < self.minimums.get(key, 0) for key, value in pairs], dtype=bool)
+        return sum_by_row(rows, shortfall * self.points, columns.row_count)
+
+
+factor_kinds = {
+    "bands": BandsFactor,
+    "category": CategoryFactor,
+    "naics": NaicsFactor,
+    "per_unit": PerUnitFactor,
+    "minimums": MinimumsFactor,
+}
+
+
+def compile_factor(spec):
+    if spec["kind"] not in factor_kinds:
+        raise ValueError(f"Unknown rating factor kind: {spec['kind']}")
+    return factor_kinds[spec["kind"]](spec)
+
+
+class RatingTable:
+    def __init__(self, form_number, spec, decisions, contribution_groups):
+        self.form_number = form_number
+        self.factors = [compile_factor(factor) for factor in spec["factors"]]
+        self.scalar_factors = [factor.compile_calculate_points() for factor in self.factors]
+        # Top-level submission fields the factors read, in first-use order
+        self.fields = tuple(dict.fromkeys(field for factor in self.factors for field in (factor.items or factor.parent or factor.key, factor.when_positive) if field))
+        self.contribution_groups = list(contribution_groups)
+        unknown_groups = {factor.group for factor in self.factors} - set(self.contribution_groups)
+        if unknown_groups:
+            raise ValueError(f"Rating table {form_number} uses unknown contribution groups: {sorted(unknown_groups)}")
+        self.factor_groups = [self.contribution_groups.index(factor.group) for factor in self.factors]
+        self.minimum_score = spec.get("minimum_score", 0)
+        self.decision_breakpoints = list(spec["decision_breakpoints"])
+        self.decisions = list(decisions)
+        # Decisions past the listed modifiers (Decline) have no premium modifier
+        self.premium_modifiers = list(spec["premium_modifiers"]) + [None] * (len(decisions) - len(spec["premium_modifiers"]))
+
+    def calculate_risk_score(self, submission):
+        risk_score = 0
+        for calculate_points in self.scalar_factors:
+            risk_score += calculate_points(submission)
+        return risk_score
+
+    def explain(self, submission):
+        """
+        Score and decide one submission, keeping each factor's points in its contribution group from the same pass.
+
+        Parameters:
+        - submission (dict): The form's underwriting fields.
+
+        Returns:
+        - dict: The decide() result plus "contributions", int32 points per group in contribution_groups order.
+        """
+        contributions = [0] * len(self.contribution_groups)
+        for group_index, calculate_points in zip(self.factor_groups, self.scalar_factors):
+            contributions[group_index] += calculate_points(submission)
+        underwriting = self.decide(sum(contributions))
+        underwriting["contributions"] = np.array(contributions, dtype=np.int32)
+        return underwriting
+
+    def decide(self, risk_score):
+        if risk_score < self.minimum_score:
+            risk_score = self.minimum_score
+        decision_index = bisect_right(self.decision_breakpoints, risk_score)
+        return {
+            "decision": self.decisions[decision_index],
+            "risk_score": risk_score,
+            "premium_modifier": self.premium_modifiers[decision_index]
+        }
+
+    def calculate_risk_scores(self, data):
+        columns = BatchColumns(data)
+        risk_scores = np.zeros(columns.row_count, dtype=np.int64)
+        for factor in self.factors:
+            risk_scores = risk_scores + factor.calculate_batch_points(columns)
+        return risk_scores
+
+    def calculate_batch_contributions(self, data):
+        """
+        Score a book of submissions and keep each factor's points in its contribution group.
+
+        Parameters:
+        - data (pd.DataFrame | dict): One row per submission.
+
+        Returns:
+        - np.ndarray: int32 array of shape (rows, groups) in contribution_groups order; each row sums to the risk score.
+        """
+        columns = BatchColumns(data)
+        # Column-major so each factor adds its points into one contiguous column
+        contributions = np.zeros((columns.row_count, len(self.contribution_groups)), dtype=np.int32, order="F")
+        for group_index, factor in zip(self.factor_groups, self.factors):
+            np.add(contributions[:, group_index], factor.calculate_batch_points(columns), out=contributions[:, group_index], casting="unsafe")
+        return contributions
+
+    def get_decision_codes(self, risk_scores):
+        decision_codes = np.zeros(len(risk_scores), dtype=np.int8)
+        for breakpoint in self.decision_breakpoints:
+            decision_codes += risk_scores >= breakpoint
+        return decision_codes
+
+    def decide_batch(self, risk_scores):
+        risk_scores = np.maximum(risk_scores, self.minimum_score)
+        decision_codes = self.get_decision_codes(risk_scores)
+        decision = pd.Categorical.from_codes(decision_codes, categories=self.decisions)
+        premium_modifier = np.array([np.nan if modifier is None else modifier for modifier in self.premium_modifiers])[decision_codes]
+        return decision, risk_scores, premium_modifier
+
+    def get_factor(self, name):
+        for factor in self.factors:
+            if factor.name == name:
+                return factor
+        raise ValueError(f"Rating table {self.form_number} has no factor {name}")
+
+    def sweep_breakpoint(self, data, factor_name, thresholds, breakpoint_index=0):
+        """
+        Re-underwrite a portfolio for every candidate value of one band breakpoint.
+
+        Parameters:
+        - data (pd.DataFrame | dict): The portfolio, in the same layout as calculate_risk_scores.
+        - factor_name (str): A bands factor scored on a per-submission field, e.g. "payroll".
+        - thresholds (array-like): Candidate values for the breakpoint.
+        - breakpoint_index (int): Which of the factor's breakpoints to move.
+
+        Returns:
+        - pd.DataFrame: One row per threshold with the count per decision, decisions_changed against the current
+          breakpoint, mean_risk_score and average_premium_modifier (over submissions that are not declined).
+        """
+        factor = self.get_factor(factor_name)
+        if not isinstance(factor, BandsFactor) or factor.items is not None:
+            raise ValueError(f"Rating factor {factor_name} is not a bands factor on a per-submission field")
+        if not 0 <= breakpoint_index < len(factor.breakpoints):
+            raise ValueError(f"Rating factor {factor_name} has no breakpoint {breakpoint_index}")
+        thresholds = np.asarray(thresholds, dtype=np.float64)
+        columns = BatchColumns(data)
+        risk_scores = np.zeros(columns.row_count, dtype=np.int64)
+        for scored_factor in self.factors:
+            risk_scores = risk_scores + scored_factor.calculate_batch_points(columns)
+        values = np.asarray(factor.read_batch_values(columns.data), dtype=np.float64)
+
+        # The swept breakpoint only switches one band step on or off, so each submission has exactly two possible scores
+        above = factor.compare == ">"
+        breakpoint = factor.breakpoints[breakpoint_index]
+        step = factor.points[breakpoint_index + 1] - factor.points[breakpoint_index] if above else factor.points[breakpoint_index] - factor.points[breakpoint_index + 1]
+        eligible = np.ones(columns.row_count, dtype=bool) if factor.when_positive is None else get_column(columns.data, factor.when_positive) > 0
+        active = eligible & ((values > breakpoint) if above else (values < breakpoint))
+        scores_off = np.maximum(risk_scores - step * active, self.minimum_score)
+        scores_on = np.maximum(risk_scores - step * active + step * eligible, self.minimum_score)
+
+        # Sorting once turns "which submissions cross each threshold" into prefix sums read with searchsorted
+        order = np.argsort(values, kind="stable")
+        valid_count = int(np.count_nonzero(~np.isnan(values)))
+        sorted_values = values[order[:valid_count]]
+        decision_count = len(self.decisions)
+        one_hot_off = np.eye(decision_count, dtype=np.int64)[self.get_decision_codes(scores_off)[order]]
+        one_hot_on = np.eye(decision_count, dtype=np.int64)[self.get_decision_codes(scores_on)[order]]
+        prefix_off = np.vstack([np.zeros((1, decision_count), dtype=np.int64), np.cumsum(one_hot_off[:valid_count], axis=0)])
+        prefix_on = np.vstack([np.zeros((1, decision_count), dtype=np.int64), np.cumsum(one_hot_on[:valid_count], axis=0)])
+        prefix_changed = np.concatenate([[0], np.cumsum(np.any(one_hot_off != one_hot_on, axis=1)[:valid_count])])
+        prefix_score_off = np.concatenate([[0], np.cumsum(scores_off[order][:valid_count])])
+        prefix_score_on = np.concatenate([[0], np.cumsum(scores_on[order][:valid_count])])
+        # Submissions with a missing value never cross a breakpoint
+        missing_counts = one_hot_off[valid_count:].sum(axis=0)
+        missing_score = scores_off[order][valid_count:].sum()
+
+        def switched_on_below(positions):
+            # Rows at sorted positions below each index have the step switched on, the rest have it off
+            counts = prefix_on[positions] + (prefix_off[valid_count] - prefix_off[positions])
+            scores = prefix_score_on[positions] + (prefix_score_off[valid_count] - prefix_score_off[positions])
+            return counts, scores
+
+        def switched_on_above(positions):
+            counts = prefix_off[positions] + (prefix_on[valid_count] - prefix_on[positions])
+            scores = prefix_score_off[positions] + (prefix_score_on[valid_count] - prefix_score_on[positions])
+            return counts, scores
+
+        if above:
+            positions = np.searchsorted(sorted_values, thresholds, side="right")
+            current_position = np.searchsorted(sorted_values, breakpoint, side="right")
+            decision_counts, score_sums = switched_on_above(positions)
+        else:
+            positions = np.searchsorted(sorted_values, thresholds, side="left")
+            current_position = np.searchsorted(sorted_values, breakpoint, side="left")
+            decision_counts, score_sums = switched_on_below(positions)
+        decision_counts = decision_counts + missing_counts
+        score_sums = score_sums + missing_score
+
+        sweep = pd.DataFrame(decision_counts, columns=self.decisions, index=pd.Index(thresholds, name="threshold"))
+        sweep["decisions_changed"] = np.abs(prefix_changed[positions] - prefix_changed[current_position])
+        sweep["mean_risk_score"] = score_sums / max(columns.row_count, 1)
+        modifiers = np.array([np.nan if modifier is None else modifier for modifier in self.premium_modifiers])
+        priced = ~np.isnan(modifiers)
+        priced_counts = decision_counts[:, priced].sum(axis=1)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            sweep["average_premium_modifier"] = decision_counts[:, priced] @ modifiers[priced] / priced_counts
+        return sweep
+
+
+class RatingTables:
+    def __init__(self, spec, mtime, digest):
+        self.version = spec["version"]
+        self.mtime = mtime
+        self.digest = digest
+        self.rules_version = f"{self.version}:{digest}"
+        self.checked_at = 0.0
+        self.forms = {str(form_number): RatingTable(str(form_number), form, spec["decisions"], spec["contribution_groups"]) for form_number, form in spec["forms"].items()}
+
+    def get_rating_table(self, form_number):
+        return self.forms[str(form_number)]
+
+
+def load_rating_tables(path=rating_tables_path):
+    """
+    Load and compile the rating tables, reusing the compiled tables until the file changes on disk.
+
+    Parameters:
+    - path (str): The TOML rating table file.
+
+    Returns:
+    - RatingTables: The compiled rating tables for every form.
+    """
+    rating_tables = compiled_rating_tables.get(path)
+    now = time.monotonic()
+    if rating_tables is not None and now - rating_tables.checked_at < mtime_check_interval:
+        return rating_tables
+    mtime = os.stat(path).st_mtime_ns
+    if rating_tables is None or rating_tables.mtime != mtime:
+        with open(path, "rb") as rating_tables_file:
+            content = rating_tables_file.read()
+        rating_tables = RatingTables(tomllib.loads(content.decode("utf-8")), mtime, hashlib.sha256(content).hexdigest())
+        compiled_rating_tables[path] = rating_tables
+    rating_tables.checked_at = now
+    return rating_tables
+
+
+def get_rating_table(form_number, path=rating_tables_path):
+    return load_rating_tables(path).get_rating_table(form_number)
@@ -0,0 +1,98 @@
+import time
+from classes import run_poller_class
+
+
+class RunDriver:
+    def __init__(self, client, thread_id, assistant_id, tool_executor, poller=None, max_rounds=8, max_seconds=300, max_polls=None):
+        """
+        Drive an assistant run through any number of tool rounds until it reaches a terminal status.
+
+        Parameters:
+        - client (OpenAI): The OpenAI client.
+        - thread_id (str): The thread the run belongs to.
+        - assistant_id (str): The assistant to run.
+        - tool_executor (ToolExecutor): Executes each requires_action step's tool calls.
+        - poller (RunPoller, optional): Paces the retrieve requests; defaults to the shared run_poller.
+        - max_rounds (int): Tool rounds allowed before the run is cancelled.
+        - max_seconds (float): Wall-clock seconds allowed before the run is cancelled.
+        - max_polls (int, optional): Retrieve requests allowed across all of a run's rounds before it is cancelled; defaults to the poller's max_polls.
+        """
+        self.client = client
+        self.thread_id = thread_id
+        self.assistant_id = assistant_id
+        self.tool_executor = tool_executor
+        self.poller = poller or run_poller_class.run_poller
+        self.max_rounds = max_rounds
+        self.max_seconds = max_seconds
+        self.max_polls = self.poller.max_polls if max_polls is None else max_polls
+        self.run = None
+        self.state = None
+        self.stop_reason = None
+        self.rounds = []
+
+    def retrieve_run(self):
+        return self.client.beta.threads.runs.retrieve(run_id=self.run.id, thread_id=self.thread_id)
+
+    def drive(self, run=None):
+        """
+        Create a run (or continue the given one) and drive it to the end.
+
+        Parameters:
+        - run (Run, optional): An already created run to continue.
+
+        Returns:
+        - Run: The run in its last known status. stop_reason is its status, or round_budget / poll_budget /
+          time_budget when the driver cancelled it; rounds holds one latency record per model step.
+        """
+        deadline = time.monotonic() + self.max_seconds
+        self.rounds = []
+        self.stop_reason = None
+        self.run = run or self.client.beta.threads.runs.create(thread_id=self.thread_id, assistant_id=self.assistant_id)
+        self.state = "waiting"
+        model_started_at = time.monotonic()
+        while True:
+            if self.state == "waiting":
+                # The poll budget covers the whole run, so each round may only spend what the earlier ones left
+                polls_left = self.max_polls - sum(latency["polls"] for latency in self.rounds)
+                try:
+                    self.run, polls = self.poller.poll(self.retrieve_run, self.assistant_id, deadline, polls_left)
+                except run_poller_class.PollBudgetExceeded as e:
+                    self.rounds.append({"model_seconds": time.monotonic() - model_started_at, "polls": e.polls, "tool_calls": 0, "tool_seconds": 0.0})
+                    return self.stop("poll_budget")
+                except TimeoutError:
+                    return self.stop("time_budget")
+                self.rounds.append({"model_seconds": time.monotonic() - model_started_at, "polls": polls, "tool_calls": 0, "tool_seconds": 0.0})
+                self.state = self.run.status
+            elif self.state == "requires_action":
+                if len(self.rounds) > self.max_rounds:
+                    return self.stop("round_budget")
+                tool_calls = self.run.required_action.submit_tool_outputs.tool_calls
+                tool_started_at = time.monotonic()
+                tool_outputs = self.tool_executor.execute_tool_calls(tool_calls)
+                self.rounds[-1].update(tool_calls=len(tool_calls), tool_seconds=time.monotonic() - tool_started_at)
+                if time.monotonic() >= deadline:
+                    return self.stop("time_budget")
+                self.run = self.client.beta.threads.runs.submit_tool_outputs(tool_outputs=tool_outputs, run_id=self.run.id, thread_id=self.thread_id)
+                model_started_at = time.monotonic()
+                self.state = "waiting"
+            else:
+                # completed, failed, cancelled, expired or incomplete
+                self.stop_reason = self.state
+                return self.run
+
+    def stop(self, reason):
+        # A run left active keeps the thread locked, so one that blew its budget is cancelled
+        self.run = self.client.beta.threads.runs.cancel(run_id=self.run.id, thread_id=self.thread_id)
+        self.state = self.stop_reason = reason
+        return self.run
+
+    def get_metrics(self):
+        """
+        Summarize where the last run's time went.
+
+        Returns:
+        - dict: tool_rounds, polls, model_seconds and tool_seconds totals, and the stop_reason.
+        """
+        return {"tool_rounds": sum(1 for latency in self.rounds if latency["tool_calls"]), "polls": sum(latency["polls"] for latency in self.rounds),
+                "model_seconds": sum(latency["model_seconds"] for latency in self.rounds), "tool_seconds": sum(latency["tool_seconds"] for latency in self.rounds),
+                "stop_reason": self.stop_reason}
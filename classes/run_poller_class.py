@@ -0,0 +1,86 @@
+import random
+import threading
+import time
+
+
+# Run statuses that polling waits through; anything else (completed, requires_action, failed, ...) ends a poll
+pending_statuses = {"queued", "in_progress", "cancelling"}
+
+
+class PollBudgetExceeded(TimeoutError):
+    def __init__(self, message, polls):
+        super().__init__(message)
+        self.polls = polls
+
+
+class RunPoller:
+    def __init__(self, initial_delay=0.1, max_delay=5.0, backoff=2.0, jitter=0.5, max_polls=120, smoothing=0.3):
+        """
+        Poll assistant runs quickly at first, then back off exponentially with jitter.
+
+        Parameters:
+        - initial_delay (float): Seconds before the first poll.
+        - max_delay (float): Longest wait between polls.
+        - backoff (float): Factor the delay grows by after each poll.
+        - jitter (float): Fraction of each delay that is randomized, so sessions started together do not poll in lockstep.
+        - max_polls (int): Retrieve requests allowed per poll before giving up, unless the caller passes its own budget.
+        - smoothing (float): Weight of the newest run in each assistant's moving average duration.
+        """
+        self.initial_delay = initial_delay
+        self.max_delay = max_delay
+        self.backoff = backoff
+        self.jitter = jitter
+        self.max_polls = max_polls
+        self.smoothing = smoothing
+        self.expected_durations = {}
+        self.lock = threading.Lock()
+
+    def get_delay(self, polls, elapsed, expected_duration):
+        delay = min(self.max_delay, self.initial_delay * self.backoff ** polls)
+        if expected_duration is not None and elapsed < expected_duration:
+            # Runs of this assistant usually take longer, so the gap to the expected finish is closed by halves
+            delay = min(self.max_delay, max(delay, (expected_duration - elapsed) / 2))
+        return delay * (1 - self.jitter * random.random())
+
+    def record_duration(self, assistant_id, duration):
+        with self.lock:
+            expected_duration = self.expected_durations.get(assistant_id)
+            if expected_duration is None:
+                self.expected_durations[assistant_id] = duration
+            else:
+                self.expected_durations[assistant_id] = expected_duration + self.smoothing * (duration - expected_duration)
+
+    def poll(self, retrieve, assistant_id=None, deadline=None, max_polls=None):
+        """
+        Retrieve a run until it leaves the queued/in_progress/cancelling statuses.
+
+        Parameters:
+        - retrieve (function): Returns the run's current state, e.g. a runs.retrieve call.
+        - assistant_id (str, optional): Whose observed run durations pace the polling.
+        - deadline (float, optional): time.monotonic() value after which polling gives up.
+        - max_polls (int, optional): Retrieve requests allowed on this call, e.g. what is left of a run's budget; defaults to the poller's max_polls.
+
+        Returns:
+        - tuple: The run in its new status, and the number of retrieve requests it took.
+        Raises PollBudgetExceeded once max_polls requests are spent, and TimeoutError at the deadline.
+        """
+        max_polls = self.max_polls if max_polls is None else max_polls
+        started_at = time.monotonic()
+        expected_duration = self.expected_durations.get(assistant_id)
+        for polls in range(max_polls):
+            delay = self.get_delay(polls, time.monotonic() - started_at, expected_duration)
+            if deadline is not None:
+                if time.monotonic() >= deadline:
+                    raise TimeoutError(f"Run still pending at its deadline after {polls} polls")
+                delay = min(delay, deadline - time.monotonic())
+            time.sleep(max(0.0, delay))
+            run = retrieve()
+            if run.status not in pending_statuses:
+                if assistant_id is not None:
+                    self.record_duration(assistant_id, time.monotonic() - started_at)
+                return run, polls + 1
+        raise PollBudgetExceeded(f"Run still pending after {max(max_polls, 0)} polls", max(max_polls, 0))
+
+
+# Shared by every session in the process, so each assistant's run durations are learned once
+run_poller = RunPoller()
@@ -0,0 +1,80 @@
+import time
+from openai import AssistantEventHandler
+
+
+class RunEventHandler(AssistantEventHandler):
+    # The SDK binds a handler to a single stream, so RunStream creates one per stream and keeps the shared state itself
+    def __init__(self, run_stream):
+        super().__init__()
+        self.run_stream = run_stream
+
+    def on_event(self, event):
+        if event.event.startswith("thread.run.") and not event.event.startswith("thread.run.step."):
+            self.run_stream.run = event.data
+
+    def on_text_delta(self, delta, snapshot):
+        if delta.value:
+            self.run_stream.add_text(delta.value)
+
+
+class RunStream:
+    def __init__(self, client, thread_id, render=None):
+        self.client = client
+        self.thread_id = thread_id
+        self.render = render
+        self.run = None
+        self.text = ""
+        self.tool_rounds = 0
+        self.started_at = None
+        self.first_token_at = None
+        self.finished_at = None
+
+    def add_text(self, value):
+        if self.first_token_at is None:
+            self.first_token_at = time.perf_counter()
+        self.text += value
+        if self.render is not None:
+            self.render(self.text + "▌")
+
+    def stream(self, assistant_id, handle_tool_calls):
+        """
+        Run the assistant on the thread over the run event stream, rendering text as it arrives.
+
+        Parameters:
+        - assistant_id (str): The assistant to run.
+        - handle_tool_calls (function): Called with the run's tool calls when it requires action; returns the tool outputs to submit.
+
+        Returns:
+        - str: The assistant's full response text.
+        """
+        self.started_at = time.perf_counter()
+        stream = self.client.beta.threads.runs.stream(thread_id=self.thread_id, assistant_id=assistant_id, event_handler=RunEventHandler(self))
+        while stream is not None:
+            with stream as event_stream:
+                event_stream.until_done()
+            stream = None
+            if self.run is not None and self.run.status == "requires_action":
+                # The server ends each stream at requires_action; the run resumes on a new stream once the outputs are submitted
+                self.tool_rounds += 1
+                tool_outputs = handle_tool_calls(self.run.required_action.submit_tool_outputs.tool_calls)
+                stream = self.client.beta.threads.runs.submit_tool_outputs_stream(tool_outputs=tool_outputs, run_id=self.run.id, thread_id=self.thread_id, event_handler=RunEventHandler(self))
+        self.finished_at = time.perf_counter()
+        if self.render is not None:
+            self.render(self.text)
+        return self.text
+
+    @property
+    def time_to_first_token(self):
+        if self.first_token_at is None:
+            return None
+        return self.first_token_at - self.started_at
+
+    def get_metrics(self):
+        """
+        Report the latency of the last streamed run.
+
+        Returns:
+        - dict: time_to_first_token and total_time in seconds (None until known), and the number of tool_rounds.
+        """
+        total_time = self.finished_at - self.started_at if self.finished_at is not None else None
+        return {"time_to_first_token": self.time_to_first_token, "total_time": total_time, "tool_rounds": self.tool_rounds}
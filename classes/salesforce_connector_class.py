@@ -0,0 +1,92 @@
+import time
+import functools
+import threading
+import requests
+from simple_salesforce import Salesforce
+from simple_salesforce.exceptions import SalesforceExpiredSession
+
+
+# Salesforce client methods the connector serves directly
+proxied_methods = {"query", "query_more", "query_all", "search", "quick_search", "describe", "restful", "apexecute", "toolingexecute", "limits"}
+
+
+class SalesforceConnector:
+    def __init__(self, username, password, security_token, session_timeout=7200, **options):
+        """
+        Log in to Salesforce on first use and share the session across threads until it expires.
+
+        Parameters:
+        - username (str): The Salesforce username.
+        - password (str): The Salesforce password.
+        - security_token (str): The user's security token.
+        - session_timeout (float): Seconds of inactivity after which Salesforce ends a session (the org's timeout, 2 hours by default).
+        - options: Other simple_salesforce.Salesforce arguments, e.g. domain or version.
+        """
+        self.credentials = dict(options, username=username, password=password, security_token=security_token)
+        self.session_timeout = session_timeout
+        self.http_session = requests.Session()
+        self.client = None
+        self.used_at = 0.0
+        self.login_count = 0
+        self.lock = threading.Lock()
+
+    def login(self):
+        # Logins reuse one requests session, so the connection pool survives a session refresh
+        self.client = Salesforce(session=self.http_session, **self.credentials)
+        self.login_count += 1
+
+    def get_client(self):
+        client = self.client
+        # A minute of margin, so a request is not sent on a session about to time out
+        if client is None or time.monotonic() - self.used_at > self.session_timeout - 60:
+            with self.lock:
+                if self.client is client:
+                    self.login()
+                client = self.client
+        self.used_at = time.monotonic()
+        return client
+
+    def invalidate(self, client):
+        # Only the session that failed is replaced; another thread may already have logged in again
+        with self.lock:
+            if self.client is client:
+                self.client = None
+
+    def run(self, operation):
+        client = self.get_client()
+        try:
+            return operation(client)
+        except SalesforceExpiredSession:
+            # INVALID_SESSION_ID: the session was revoked or timed out early, so log in again and retry once
+            self.invalidate(client)
+            return operation(self.get_client())
+
+    def call(self, method_name, *args, **kwargs):
+        return self.run(lambda client: getattr(client, method_name)(*args, **kwargs))
+
+    def bulk2_query(self, object_name, query, **kwargs):
+        """
+        Run a Bulk API 2.0 query, retrying the job once if its session has expired when it is created.
+
+        Parameters:
+        - object_name (str): The queried object, e.g. "Account".
+        - query (str): The SOQL query.
+        - kwargs: Other SFBulk2Type.query arguments, e.g. wait or max_records.
+
+        Returns:
+        - generator: The job's result chunks as CSV text; an expiry while later chunks are read is raised, since the job cannot resume.
+        """
+        def start(client):
+            # The job is created when its generator first advances
+            chunks = getattr(client.bulk2, object_name).query(query, **kwargs)
+            return next(chunks, None), chunks
+        first_chunk, chunks = self.run(start)
+        if first_chunk is not None:
+            yield first_chunk
+            yield from chunks
+
+    def __getattr__(self, name):
+        # Stands in for a Salesforce client's query methods, each retried on an expired session; anything else needs get_client()
+        if name not in proxied_methods:
+            raise AttributeError(f"{type(self).__name__} has no attribute {name}")
+        return functools.partial(self.call, name)
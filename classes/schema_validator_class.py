@@ -0,0 +1,148 @@
+from functools import lru_cache
+from classes import acord_form_class_all
+
+
+# JSON Schema keywords the ACORD tool schemas use; anything else is rejected at compile time rather than silently ignored
+supported_keywords = {"type", "description", "properties", "required", "additionalProperties", "items", "enum"}
+
+# Python checks per JSON Schema type; bools are excluded from the numeric types as json.loads keeps them distinct
+type_checks = {
+    "object": "type({value}) is dict",
+    "array": "type({value}) is list",
+    "string": "type({value}) is str",
+    "integer": "(type({value}) is int or (type({value}) is float and {value}.is_integer()))",
+    "number": "(type({value}) is int or type({value}) is float)",
+    "boolean": "type({value}) is bool",
+    "null": "{value} is None",
+}
+
+
+class SchemaValidationError(ValueError):
+    def __init__(self, name, errors):
+        super().__init__(f"{name}: " + "; ".join(errors))
+        self.name = name
+        self.errors = errors
+
+
+class ValidatorCompiler:
+    def __init__(self):
+        self.lines = []
+        self.constants = {}
+        self.variable_count = 0
+
+    def new_variable(self, prefix):
+        self.variable_count += 1
+        return f"{prefix}{self.variable_count}"
+
+    def add_error(self, indent, path, message):
+        # Paths are f-string templates so array indexes are only formatted when an error is actually reported
+        self.lines.append(f"{indent}errors.append(f{path + ': ' + message!r})")
+
+    def compile_node(self, schema, value, path, indent):
+        unsupported = set(schema) - supported_keywords
+        if unsupported:
+            raise ValueError(f"Unsupported JSON Schema keywords at {path or '<root>'}: {sorted(unsupported)}")
+        schema_type = schema.get("type")
+        if schema_type is not None:
+            if schema_type not in type_checks:
+                raise ValueError(f"Unsupported JSON Schema type at {path or '<root>'}: {schema_type}")
+            self.lines.append(f"{indent}if not {type_checks[schema_type].format(value=value)}:")
+            self.add_error(indent + "    ", path or "<root>", f"expected {schema_type}")
+            self.lines.append(f"{indent}else:")
+            indent += "    "
+        body_start = len(self.lines)
+        if "enum" in schema:
+            allowed = self.new_variable("allowed")
+            self.constants[allowed] = frozenset(schema["enum"])
+            self.lines.append(f"{indent}if {value} not in {allowed}:")
+            self.add_error(indent + "    ", path or "<root>", f"must be one of {list(schema['enum'])}")
+        for key in schema.get("required", ()):
+            self.lines.append(f"{indent}if {key!r} not in {value}:")
+            self.add_error(indent + "    ", self.join_path(path, key), "is required")
+        additional_properties = schema.get("additionalProperties", True)
+        if additional_properties is not True:
+            if additional_properties is not False:
+                raise ValueError(f"Unsupported JSON Schema additionalProperties at {path or '<root>'}: only true or false")
+            allowed, extra = self.new_variable("allowed"), self.new_variable("extra")
+            self.constants[allowed] = frozenset(schema.get("properties", {}))
+            self.lines.append(f"{indent}if not {value}.keys() <= {allowed}:")
+            self.lines.append(f"{indent}    for {extra} in {value}:")
+            self.lines.append(f"{indent}        if {extra} not in {allowed}:")
+            self.add_error(indent + "            ", f"{path}.{{{extra}}}" if path else f"{{{extra}}}", "is not allowed")
+        for key, property_schema in schema.get("properties", {}).items():
+            property_value = self.new_variable("value")
+            self.lines.append(f"{indent}if {key!r} in {value}:")
+            self.lines.append(f"{indent}    {property_value} = {value}[{key!r}]")
+            self.compile_node(property_schema, property_value, self.join_path(path, key), indent + "    ")
+        if "items" in schema:
+            index, item = self.new_variable("index"), self.new_variable("item")
+            self.lines.append(f"{indent}for {index}, {item} in enumerate({value}):")
+            self.compile_node(schema["items"], item, f"{path}[{{{index}}}]", indent + "    ")
+        if len(self.lines) == body_start:
+            self.lines.append(f"{indent}pass")
+
+    @staticmethod
+    def join_path(path, key):
+        key = str(key).replace("{", "{{").replace("}", "}}")
+        return f"{path}.{key}" if path else key
+
+
+def compile_validator(schema, name="validate"):
+    """
+    Compile a JSON Schema into a Python function that reports every violation in one call.
+
+    Parameters:
+    - schema (dict): The schema, limited to type, properties, required, additionalProperties (true or false), items and enum.
+    - name (str): Name given to the generated function, shown in tracebacks.
+
+    Returns:
+    - function: validate(value) -> list of error strings, empty when the value is valid.
+    """
+    compiler = ValidatorCompiler()
+    compiler.compile_node(schema, "value", "", "    ")
+    source = "\n".join([f"def {name}(value):", "    errors = []", *compiler.lines, "    return errors"])
+    namespace = dict(compiler.constants)
+    exec(compile(source, f"<schema validator {name}>", "exec"), namespace)
+    validate = namespace[name]
+    validate.source = source
+    return validate
+
+
+class ToolValidator:
+    def __init__(self, tool):
+        self.name = tool["name"]
+        # Arguments become submit_underwriter_data keywords, so unknown ones are reported here rather than raising TypeError there
+        self.validate = compile_validator({"additionalProperties": False, **tool["parameters"]}, self.name)
+
+    def check(self, arguments):
+        errors = self.validate(arguments)
+        if errors:
+            raise SchemaValidationError(self.name, errors)
+        return arguments
+
+    def validate_batch(self, submissions):
+        """
+        Validate many tool-call argument dicts in one pass.
+
+        Parameters:
+        - submissions (iterable of dict | pd.DataFrame): The submissions; a DataFrame is validated row by row.
+
+        Returns:
+        - dict: Errors keyed by submission position (or DataFrame index), holding only the invalid submissions.
+        """
+        if hasattr(submissions, "to_dict") and hasattr(submissions, "index"):
+            submissions = dict(zip(submissions.index, submissions.to_dict("records")))
+        items = submissions.items() if isinstance(submissions, dict) else enumerate(submissions)
+        validate = self.validate
+        batch_errors = {}
+        for position, arguments in items:
+            errors = validate(arguments)
+            if errors:
+                batch_errors[position] = errors
+        return batch_errors
+
+
+@lru_cache(maxsize=None)
+def get_tool_validator(form_number):
+    # Compiled on first use per form and shared process-wide, so lazy form loading is kept
+    return ToolValidator(acord_form_class_all.get_form_tool(form_number))
@@ -0,0 +1,146 @@
+import io
+import re
+import itertools
+import pandas as pd
+from classes import salesforce_connector_class
+
+
+# Above this many rows a query runs as a Bulk API 2.0 job, which returns CSV in 50,000-row chunks instead of 2,000-record JSON pages
+bulk_threshold = 50000
+# Seconds the Bulk API job is left before its status is first checked (simple_salesforce waits 5 by default)
+bulk_wait = 1.0
+select_pattern = re.compile(r"^\s*select\s+(?P<fields>.+?)\s+from\s+(?P<object_name>\w+)", re.IGNORECASE | re.DOTALL)
+
+
+def parse_query(query):
+    """
+    Read the selected fields and the queried object from a SOQL query.
+
+    Parameters:
+    - query (str): The SOQL query.
+
+    Returns:
+    - tuple: The field names (None when the query selects subqueries or functions) and the object name (None if it cannot be parsed).
+    """
+    match = select_pattern.match(query)
+    if match is None:
+        return None, None
+    fields = [field.strip() for field in match.group("fields").split(",")]
+    if any("(" in field or " " in field for field in fields):
+        return None, match.group("object_name")
+    return fields, match.group("object_name")
+
+
+def get_field(record, path):
+    value = record
+    for name in path:
+        if not isinstance(value, dict):
+            return None
+        if name in value:
+            value = value[name]
+        else:
+            # SOQL names are case-insensitive, but the response uses each field's API name
+            folded = name.casefold()
+            value = next((item for key, item in value.items() if key.casefold() == folded), None)
+    return value
+
+
+def flatten_record(record, prefix=""):
+    # {"Owner": {"attributes": ..., "Name": "x"}} -> {"Owner.Name": "x"}
+    row = {}
+    for key, value in record.items():
+        if key == "attributes":
+            continue
+        if isinstance(value, dict) and "attributes" in value:
+            row.update(flatten_record(value, f"{prefix}{key}."))
+        else:
+            row[prefix + key] = value
+    return row
+
+
+def iter_pages(salesforce_client, query):
+    # Each page is requested only once the previous one has been consumed
+    result = salesforce_client.query(query)
+    yield result
+    while not result["done"]:
+        result = salesforce_client.query_more(result["nextRecordsUrl"], identifier_is_url=True)
+        yield result
+
+
+def iter_records(salesforce_client, query, fields=None):
+    """
+    Stream a SOQL query's records, following nextRecordsUrl one page at a time.
+
+    Parameters:
+    - salesforce_client (Salesforce): The client, or a SalesforceConnector.
+    - query (str): The SOQL query.
+    - fields (list, optional): Dotted field names to keep, e.g. "Owner.Name"; defaults to the query's selected fields.
+
+    Returns:
+    - generator: One dict per record, by field name.
+    """
+    fields = fields or parse_query(query)[0]
+    paths = [field.split(".") for field in fields] if fields else None
+    for page in iter_pages(salesforce_client, query):
+        for record in page["records"]:
+            yield flatten_record(record) if paths is None else {field: get_field(record, path) for field, path in zip(fields, paths)}
+
+
+def bulk_query_frame(salesforce_client, query, object_name, fields=None, wait=bulk_wait):
+    if isinstance(salesforce_client, salesforce_connector_class.SalesforceConnector):
+        chunks = salesforce_client.bulk2_query(object_name, query, wait=wait)
+    else:
+        chunks = getattr(salesforce_client.bulk2, object_name).query(query, wait=wait)
+    frames = [pd.read_csv(io.StringIO(chunk)) for chunk in chunks if chunk.strip()]
+    if not frames:
+        # A job that matched nothing can return no CSV at all; the frame still has the requested columns
+        return pd.DataFrame(columns=fields)
+    results_df = pd.concat(frames, ignore_index=True)
+    if fields:
+        # The CSV header has the API names; the columns are named as the caller asked for them
+        columns = {column.casefold(): column for column in results_df.columns}
+        results_df = results_df[[columns[field.casefold()] for field in fields]]
+        results_df.columns = fields
+    return results_df
+
+
+def query_frame(salesforce_client, query, fields=None, max_rows=None, bulk_threshold=bulk_threshold, wait=bulk_wait):
+    """
+    Run a SOQL query into a DataFrame, holding at most one page of records at a time besides the columns.
+
+    Parameters:
+    - salesforce_client (Salesforce): The client, or a SalesforceConnector.
+    - query (str): The SOQL query.
+    - fields (list, optional): Dotted field names to keep; defaults to the query's selected fields.
+    - max_rows (int, optional): Stop paging once this many rows are read.
+    - bulk_threshold (int, optional): Switch to a Bulk API 2.0 job when the query matches more rows than this; None to always page.
+    - wait (float): Seconds before a Bulk API job's status is first checked.
+
+    Returns:
+    - DataFrame: One column per field, built once from the streamed values.
+    """
+    query_fields, object_name = parse_query(query)
+    fields = fields or query_fields
+    pages = iter_pages(salesforce_client, query)
+    first_page = next(pages)
+    if bulk_threshold is not None and object_name and first_page["totalSize"] > bulk_threshold and (max_rows is None or max_rows > bulk_threshold):
+        # Only the first page has been read; the rest of the REST query is abandoned for the job
+        pages.close()
+        return bulk_query_frame(salesforce_client, query, object_name, fields, wait)
+    paths = [field.split(".") for field in fields] if fields else None
+    columns = {field: [] for field in fields} if fields else None
+    records = []
+    row_count = 0
+    for page in itertools.chain([first_page], pages):
+        if paths is None:
+            records.extend(flatten_record(record) for record in page["records"])
+        else:
+            for record in page["records"]:
+                for field, path in zip(fields, paths):
+                    columns[field].append(get_field(record, path))
+        row_count += len(page["records"])
+        if max_rows is not None and row_count >= max_rows:
+            pages.close()
+            break
+    results_df = pd.DataFrame(records) if paths is None else pd.DataFrame(columns)
+    return results_df if max_rows is None else results_df.iloc[:max_rows]
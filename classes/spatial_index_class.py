@@ -0,0 +1,250 @@
+import os
+import math
+import atexit
+import tempfile
+import threading
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+
+
+earth_radius_miles = 3958.8
+# Grid cells are this many degrees on a side, about 7 miles north to south, so a 5-mile radius spans a few cells
+default_cell_degrees = 0.1
+default_path = os.path.join(".cache", "spatial_index.npz")
+# Saves requested while indexing are batched into one write this many seconds after the first
+save_delay = 5.0
+result_columns = ["id", "label", "lat", "lng", "distance_miles"]
+
+
+def haversine_miles(lat, lng, lats, lngs):
+    lat, lng, lats, lngs = np.radians(lat), np.radians(lng), np.radians(lats), np.radians(lngs)
+    a = np.sin((lats - lat) / 2) ** 2 + np.cos(lat) * np.cos(lats) * np.sin((lngs - lng) / 2) ** 2
+    return 2 * earth_radius_miles * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+
+class SpatialIndex:
+    def __init__(self, path=None, cell_degrees=default_cell_degrees):
+        """
+        Index geocoded locations on a lat/lng grid for radius and nearest-neighbour queries.
+
+        Parameters:
+        - path (str, optional): The .npz file the index is saved to, and loaded from if it exists.
+        - cell_degrees (float): Side of a grid cell in degrees.
+        """
+        self.path = path
+        self.cell_degrees = cell_degrees
+        self.lng_cells = round(360 / cell_degrees)
+        self.lats = np.empty(1024)
+        self.lngs = np.empty(1024)
+        self.ids = []
+        self.labels = []
+        self.rows = {}
+        self.cells = {}
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.save_timer = None
+        self.version = 0
+        self.saved_version = 0
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def get_cell(self, lat, lng):
+        # Longitude cells wrap at the antimeridian, so -180 and 180 share a column
+        return math.floor(lat / self.cell_degrees), math.floor(lng / self.cell_degrees) % self.lng_cells
+
+    def load(self, path):
+        with np.load(path) as saved:
+            self.cell_degrees = float(saved["cell_degrees"])
+            self.lng_cells = round(360 / self.cell_degrees)
+            lats, lngs = saved["lats"], saved["lngs"]
+            self.ids, self.labels = saved["ids"].tolist(), saved["labels"].tolist()
+        # The grid is rebuilt in one pass rather than point by point
+        self.lats = np.resize(lats, max(2 * len(lats), 1024))
+        self.lngs = np.resize(lngs, max(2 * len(lngs), 1024))
+        self.rows = {point_id: row for row, point_id in enumerate(self.ids)}
+        cell_is = np.floor(lats / self.cell_degrees).astype(np.int64)
+        cell_js = np.floor(lngs / self.cell_degrees).astype(np.int64) % self.lng_cells
+        order = np.lexsort((cell_js, cell_is))
+        starts = np.flatnonzero(np.diff(cell_is[order], prepend=np.int64(-2 ** 62)) | np.diff(cell_js[order], prepend=np.int64(-2 ** 62)))
+        cells = zip(cell_is[order[starts]].tolist(), cell_js[order[starts]].tolist())
+        rows, bounds = order.tolist(), starts.tolist() + [len(order)]
+        self.cells = {cell: rows[start:end] for cell, start, end in zip(cells, bounds, bounds[1:])}
+
+    def insert(self, point_id, lat, lng, label):
+        row = self.rows.get(point_id)
+        if row is None:
+            row = len(self.ids)
+            if row == len(self.lats):
+                # Doubling keeps appends amortized O(1)
+                self.lats = np.resize(self.lats, 2 * row)
+                self.lngs = np.resize(self.lngs, 2 * row)
+            self.ids.append(point_id)
+            self.labels.append(label or "")
+            self.rows[point_id] = row
+        else:
+            self.cells[self.get_cell(self.lats[row], self.lngs[row])].remove(row)
+            self.labels[row] = label or self.labels[row]
+        self.lats[row], self.lngs[row] = lat, lng
+        self.cells.setdefault(self.get_cell(lat, lng), []).append(row)
+        self.version += 1
+
+    def add(self, point_id, lat, lng, label=""):
+        """
+        Add a location, or move it if its id is already indexed.
+
+        Parameters:
+        - point_id (str): The location's id, e.g. its Google place_id.
+        - lat (float): Latitude in degrees.
+        - lng (float): Longitude in degrees.
+        - label (str): A description returned with query results, e.g. the formatted address.
+        """
+        with self.lock:
+            self.insert(point_id, lat, lng, label)
+
+    def add_many(self, points):
+        with self.lock:
+            for point_id, lat, lng, label in points:
+                self.insert(point_id, float(lat), float(lng), label)
+
+    def get_candidates(self, lat, lng, radius_miles):
+        lat_degrees = math.degrees(radius_miles / earth_radius_miles)
+        lng_degrees = min(lat_degrees / max(math.cos(math.radians(min(abs(lat) + lat_degrees, 90.0))), 1e-9), 360.0)
+        low_i, high_i = math.floor((lat - lat_degrees) / self.cell_degrees), math.floor((lat + lat_degrees) / self.cell_degrees)
+        # The longitude range is walked unwrapped from low_j and each column taken modulo lng_cells, so it can cross the antimeridian
+        low_j = math.floor((lng - lng_degrees) / self.cell_degrees)
+        j_span = min(math.floor((lng + lng_degrees) / self.cell_degrees) - low_j, self.lng_cells - 1)
+        if (high_i - low_i + 1) * (j_span + 1) > len(self.cells):
+            # A radius wider than the populated area is answered by scanning the cells there are
+            cells = [rows for (i, j), rows in self.cells.items() if low_i <= i <= high_i and (j - low_j) % self.lng_cells <= j_span]
+        else:
+            cells = [self.cells.get((i, j % self.lng_cells)) for i in range(low_i, high_i + 1) for j in range(low_j, low_j + j_span + 1)]
+        rows = [row for cell in cells if cell for row in cell]
+        return np.fromiter(rows, dtype=np.intp, count=len(rows))
+
+    def search(self, lat, lng, radius_miles):
+        rows = self.get_candidates(lat, lng, radius_miles)
+        distances = haversine_miles(lat, lng, self.lats[rows], self.lngs[rows])
+        within = distances <= radius_miles
+        rows, distances = rows[within], distances[within]
+        order = np.argsort(distances, kind="stable")
+        return rows[order], distances[order]
+
+    def get_results(self, rows, distances):
+        return pd.DataFrame({"id": [self.ids[row] for row in rows], "label": [self.labels[row] for row in rows],
+                             "lat": self.lats[rows], "lng": self.lngs[rows], "distance_miles": distances}, columns=result_columns)
+
+    def query_radius(self, lat, lng, radius_miles):
+        """
+        Find the indexed locations within a distance of a point.
+
+        Parameters:
+        - lat (float): Latitude in degrees.
+        - lng (float): Longitude in degrees.
+        - radius_miles (float): Great-circle distance in miles.
+
+        Returns:
+        - DataFrame: id, label, lat, lng and distance_miles, nearest first.
+        """
+        with self.lock:
+            return self.get_results(*self.search(lat, lng, radius_miles))
+
+    def query_nearest(self, lat, lng, k=5):
+        """
+        Find the k indexed locations nearest to a point.
+
+        Parameters:
+        - lat (float): Latitude in degrees.
+        - lng (float): Longitude in degrees.
+        - k (int): Locations to return, at least 1.
+
+        Returns:
+        - DataFrame: id, label, lat, lng and distance_miles, nearest first.
+        """
+        if k < 1:
+            raise ValueError(f"k must be at least 1, got {k}")
+        with self.lock:
+            k = min(k, len(self.ids))
+            # Every location within the radius has been found, so once there are k of them they are the k nearest
+            radius_miles = math.radians(self.cell_degrees) * earth_radius_miles
+            rows, distances = self.search(lat, lng, radius_miles)
+            while len(rows) < k:
+                radius_miles *= 2
+                rows, distances = self.search(lat, lng, radius_miles)
+            return self.get_results(rows[:k], distances[:k])
+
+    def save(self, path=None):
+        """
+        Write the index to an .npz file, replacing the previous file only once the new one is complete.
+
+        Parameters:
+        - path (str, optional): Defaults to the path the index was created with.
+        """
+        path = path or self.path
+        index_directory = os.path.dirname(path) or "."
+        os.makedirs(index_directory, exist_ok=True)
+        # Saves run one at a time and each takes its snapshot once it holds save_lock, so a file is never replaced by an older one
+        with self.save_lock:
+            with self.lock:
+                size, version = len(self.ids), self.version
+                arrays = {"ids": np.array(self.ids, dtype=str), "labels": np.array(self.labels, dtype=str), "lats": self.lats[:size].copy(), "lngs": self.lngs[:size].copy()}
+            with tempfile.NamedTemporaryFile(dir=index_directory, delete=False) as index_file:
+                try:
+                    np.savez(index_file, cell_degrees=self.cell_degrees, **arrays)
+                except BaseException:
+                    index_file.close()
+                    os.remove(index_file.name)
+                    raise
+            os.replace(index_file.name, path)
+            if path == self.path:
+                self.saved_version = max(self.saved_version, version)
+
+    def schedule_save(self, delay=save_delay):
+        """
+        Save the index once, delay seconds from now, however many locations are added in the meantime.
+
+        Parameters:
+        - delay (float): Seconds to wait before writing.
+        """
+        with self.lock:
+            if self.save_timer is None:
+                self.save_timer = threading.Timer(delay, self.flush)
+                self.save_timer.daemon = True
+                self.save_timer.start()
+
+    def flush(self):
+        # Writes any changes not yet saved, e.g. when a scheduled save fires or at exit
+        with self.lock:
+            save_timer, self.save_timer = self.save_timer, None
+        if save_timer is not None:
+            save_timer.cancel()
+        if self.version != self.saved_version:
+            self.save()
+
+
+def index_geocode_response(spatial_index, response):
+    # The first geocoding result is the one Tools.get_geocode callers use
+    if not response:
+        return False
+    result = response[0]
+    location = result["geometry"]["location"]
+    spatial_index.add(result.get("place_id") or result.get("formatted_address"), location["lat"], location["lng"], result.get("formatted_address", ""))
+    return True
+
+
+def index_locations(spatial_index, results_df):
+    # Rows of a GeocodePipeline result that were geocoded
+    located_df = results_df[results_df["lat"].notna() & results_df["lng"].notna()]
+    spatial_index.add_many(zip(located_df["place_id"].fillna(located_df["address"]), located_df["lat"], located_df["lng"], located_df["formatted_address"].fillna("")))
+    return len(located_df)
+
+
+@lru_cache(maxsize=None)
+def get_spatial_index(path=default_path):
+    # One index per file in the process, loaded on first use; scheduled saves still pending at exit are written then
+    spatial_index = SpatialIndex(path)
+    atexit.register(spatial_index.flush)
+    return spatial_index
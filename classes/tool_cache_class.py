@@ -0,0 +1,171 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Seconds a cached response is fresh, then how long past that it may still be served while it is refreshed in the background
+tool_cache_ttls = {
+    "search_tavily": {"ttl": 24 * 3600, "stale": 24 * 3600},
+    "validate_address": {"ttl": 30 * 24 * 3600, "stale": 7 * 24 * 3600},
+    "get_geocode": {"ttl": 30 * 24 * 3600, "stale": 7 * 24 * 3600},
+    "places_search": {"ttl": 7 * 24 * 3600, "stale": 24 * 3600},
+}
+default_ttl = {"ttl": 3600, "stale": 0}
+# Empty results (no geocode match, no places, no search results) are kept for a shorter time
+negative_ttl = 3600
+default_path = os.path.join(".cache", "tool_cache.sqlite3")
+
+
+def normalize(value):
+    # Case and whitespace do not change what the search and address APIs return
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip().casefold()
+    if isinstance(value, dict):
+        return {str(key): normalize(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [normalize(item) for item in value]
+    return value
+
+
+def is_negative(value):
+    if not value:
+        return True
+    return isinstance(value, dict) and ("results" in value and not value["results"] or value.get("status") == "ZERO_RESULTS")
+
+
+class ToolCache:
+    def __init__(self, path=default_path, max_entries=20000, ttls=None):
+        """
+        Cache external tool responses in SQLite, shared by every session and process using the same file.
+
+        Parameters:
+        - path (str): The SQLite database file; its directory is created if needed.
+        - max_entries (int): Entries kept before the least recently used are evicted.
+        - ttls (dict, optional): {"ttl", "stale"} seconds by tool name; defaults to tool_cache_ttls.
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttls = tool_cache_ttls if ttls is None else ttls
+        self.local = threading.local()
+        self.lock = threading.Lock()
+        self.stats = {}
+        self.refreshing = set()
+        self.refresh_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="tool-cache")
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        connection = self.get_connection()
+        connection.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, tool TEXT NOT NULL, value TEXT NOT NULL, negative INTEGER NOT NULL, created_at REAL NOT NULL, used_at REAL NOT NULL)")
+        connection.execute("CREATE INDEX IF NOT EXISTS entries_used_at ON entries (used_at)")
+        self.entry_count = connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def get_connection(self):
+        # SQLite connections cannot be shared across threads, so each thread opens its own
+        connection = getattr(self.local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self.local.connection = connection
+        return connection
+
+    def get_key(self, tool_name, params):
+        canonical = json.dumps([tool_name, normalize(params)], sort_keys=True, separators=(",", ":"), default=str)
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+    def count(self, tool_name, outcome):
+        with self.lock:
+            tool_stats = self.stats.setdefault(tool_name, {"hits": 0, "stale_hits": 0, "negative_hits": 0, "misses": 0})
+            tool_stats[outcome] += 1
+
+    def store(self, key, tool_name, value):
+        now = time.time()
+        connection = self.get_connection()
+        connection.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?)", (key, tool_name, json.dumps(value, default=str), int(is_negative(value)), now, now))
+        with self.lock:
+            # Replacements are counted too, so the exact count is only taken once the estimate passes the bound
+            self.entry_count += 1
+            check_size = self.entry_count > self.max_entries
+        if check_size:
+            entry_count = connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            if entry_count > self.max_entries:
+                # Evicts a tenth of the cache beyond the excess, so eviction runs rarely rather than on every insert
+                entry_count -= connection.execute("DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY used_at LIMIT ?)", (entry_count - self.max_entries + self.max_entries // 10,)).rowcount
+            with self.lock:
+                self.entry_count = entry_count
+
+    def refresh(self, key, tool_name, fetch):
+        try:
+            self.store(key, tool_name, fetch())
+        finally:
+            with self.lock:
+                self.refreshing.discard(key)
+
+    def get_or_fetch(self, tool_name, params, fetch):
+        """
+        Return a tool's cached response, fetching it on a miss and refreshing it in the background once stale.
+
+        Parameters:
+        - tool_name (str): The tool, which selects the TTLs and the hit-rate bucket.
+        - params (dict): The request parameters; the key normalizes their case and whitespace.
+        - fetch (function): Calls the external API and returns a JSON-serializable response.
+
+        Returns:
+        - The cached or freshly fetched response.
+        """
+        key = self.get_key(tool_name, params)
+        ttl = self.ttls.get(tool_name, default_ttl)
+        connection = self.get_connection()
+        row = connection.execute("SELECT value, negative, created_at FROM entries WHERE key = ?", (key,)).fetchone()
+        if row is not None:
+            value, negative, created_at = row
+            age = time.time() - created_at
+            fresh_for = negative_ttl if negative else ttl["ttl"]
+            if age < fresh_for:
+                self.count(tool_name, "negative_hits" if negative else "hits")
+                connection.execute("UPDATE entries SET used_at = ? WHERE key = ?", (time.time(), key))
+                return json.loads(value)
+            if not negative and age < fresh_for + ttl["stale"]:
+                self.count(tool_name, "stale_hits")
+                connection.execute("UPDATE entries SET used_at = ? WHERE key = ?", (time.time(), key))
+                with self.lock:
+                    start_refresh = key not in self.refreshing
+                    self.refreshing.add(key)
+                if start_refresh:
+                    self.refresh_pool.submit(self.refresh, key, tool_name, fetch)
+                return json.loads(value)
+        self.count(tool_name, "misses")
+        value = fetch()
+        self.store(key, tool_name, value)
+        return value
+
+    def get_stats(self):
+        """
+        Report cache effectiveness per tool since the process started.
+
+        Returns:
+        - dict: By tool name, hits, stale_hits, negative_hits, misses and hit_rate (all kinds of hits over lookups).
+        """
+        with self.lock:
+            stats = {}
+            for tool_name, tool_stats in self.stats.items():
+                hits = tool_stats["hits"] + tool_stats["stale_hits"] + tool_stats["negative_hits"]
+                stats[tool_name] = dict(tool_stats, hit_rate=hits / (hits + tool_stats["misses"]))
+            return stats
+
+    def clear(self):
+        self.get_connection().execute("DELETE FROM entries")
+        with self.lock:
+            self.entry_count = 0
+            self.stats = {}
+
+
+@lru_cache(maxsize=None)
+def get_tool_cache(path=default_path):
+    # One cache object per database file in the process; other processes share the same entries through the file
+    return ToolCache(path)
@@ -0,0 +1,95 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+from classes import tool_output_class
+
+
+class ToolExecutor:
+    def __init__(self, tools, max_workers=8, timeout=60, tool_timeouts=None):
+        """
+        Run the tool calls of one requires_action step concurrently.
+
+        Parameters:
+        - tools: Object serving the assistant's function tools, e.g. Tools(); its get_tool_functions() gives the dispatch table.
+        - max_workers (int): Upper bound on tool calls running at once.
+        - timeout (float): Seconds a tool call may run, counted from when a worker starts it, before its output is
+          reported as timed out; a call still queued behind max_workers others gets the same time to start.
+        - tool_timeouts (dict, optional): Timeouts by tool name, overriding timeout.
+        """
+        self.tools = tools
+        self.tool_functions = tools.get_tool_functions()
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.tool_timeouts = tool_timeouts or {}
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+
+    def get_timeout(self, tool_name):
+        return self.tool_timeouts.get(tool_name, self.timeout)
+
+    @staticmethod
+    def run_tool_call(times, tool_function, tool_args):
+        times.append(time.monotonic())
+        return tool_function(**tool_args)
+
+    @staticmethod
+    def get_result(future, times, timeout):
+        # times holds the submit time, then the start time once a worker picks the call up; the timeout counts from the latest
+        while True:
+            counted_from = times[-1]
+            try:
+                return future.result(timeout=max(0.0, counted_from + timeout - time.monotonic()))
+            except TimeoutError:
+                if times[-1] == counted_from:
+                    raise
+
+    def execute_tool_calls(self, tool_calls):
+        """
+        Execute tool calls concurrently and collect their outputs.
+
+        Parameters:
+        - tool_calls (list): The run's required_action.submit_tool_outputs.tool_calls.
+
+        Returns:
+        - list: {"tool_call_id", "output"} dicts in call order, one per tool call, with outputs shaped to their
+          configured fields and budget by tool_output_class; a tool that fails,
+          times out or does not exist reports {"error": ...} as its output so the other results are still submitted.
+        """
+        submitted = []
+        for tool_call in tool_calls:
+            tool_name = tool_call.function.name
+            # Arguments are checked per call, so one malformed call only fails its own output
+            try:
+                tool_args = json.loads(tool_call.function.arguments or "{}")
+                if not isinstance(tool_args, dict):
+                    raise ValueError(f"expected a JSON object, got {type(tool_args).__name__}")
+            except (TypeError, ValueError) as e:
+                submitted.append((tool_call, None, f"Invalid arguments for {tool_name}: {e}"))
+                continue
+            tool_function = self.tool_functions.get(tool_name)
+            if tool_function is None:
+                submitted.append((tool_call, None, f"Unknown tool: {tool_name}"))
+                continue
+            times = [time.monotonic()]
+            submitted.append((tool_call, self.pool.submit(self.run_tool_call, times, tool_function, tool_args), times))
+        tool_outputs = []
+        for tool_call, future, detail in submitted:
+            if future is None:
+                tool_output = json.dumps({"error": detail})
+            else:
+                timeout = self.get_timeout(tool_call.function.name)
+                try:
+                    tool_output = tool_output_class.shape_tool_output(tool_call.function.name, self.get_result(future, detail, timeout))
+                except TimeoutError:
+                    # A queued call is cancelled; a running thread cannot be stopped, so it finishes in the background and its result is dropped
+                    future.cancel()
+                    if len(detail) == 1:
+                        tool_output = json.dumps({"error": f"{tool_call.function.name} did not start within {timeout} seconds because no tool worker was free"})
+                    else:
+                        tool_output = json.dumps({"error": f"{tool_call.function.name} timed out after {timeout} seconds"})
+                except Exception as e:
+                    tool_output = json.dumps({"error": f"{tool_call.function.name} failed: {e}"})
+            tool_outputs.append({"tool_call_id": tool_call.id, "output": tool_output})
+        return tool_outputs
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,116 @@
+import json
+import logging
+import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+# Fields kept in each tool's output, as dotted paths into dicts (and the dicts inside lists); tools not listed keep everything.
+# Budgets cap what is submitted back to the run, in bytes or in tokens at about 4 bytes per token.
+tool_output_specs = {
+    "search_tavily": {"fields": ["query", "answer", "results.title", "results.url", "results.content", "results.score"], "max_tokens": 3000},
+    "fetch_yelp_data": {"fields": ["URL", "Response Status", "Response JSON"], "max_tokens": 6000},
+}
+default_max_bytes = 16000
+bytes_per_token = 4
+encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+def compile_fields(fields):
+    # ["results.title", "answer"] -> {"results": {"title": True}, "answer": True}
+    if fields is None:
+        return None
+    tree = {}
+    for field in fields:
+        node = tree
+        *parents, leaf = field.split(".")
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[leaf] = True
+    return tree
+
+
+def select_fields(value, fields):
+    if fields is True or fields is None:
+        return value
+    if isinstance(value, dict):
+        return {key: select_fields(value[key], subfields) for key, subfields in fields.items() if key in value}
+    if isinstance(value, (list, tuple)):
+        return [select_fields(item, fields) for item in value]
+    return value
+
+
+def iter_json(value, fields=None):
+    # Yields the compact JSON of the kept fields piece by piece, so truncation can stop serializing early
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, pd.DataFrame):
+        columns = [column for column in value.columns if fields is None or column in fields]
+        subfields = [fields[column] if fields is not None else None for column in columns]
+        yield "["
+        for index, row in enumerate(value[columns].itertuples(index=False, name=None)):
+            if index:
+                yield ","
+            yield from encoder.iterencode({column: select_fields(item, subfield) for column, item, subfield in zip(columns, row, subfields)})
+        yield "]"
+    else:
+        yield from encoder.iterencode(select_fields(value, fields))
+
+
+def measure_size(value):
+    # Serialized bytes, the same measure as the shaped output, so the two logged sizes compare
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return sum(len(chunk.encode("utf-8")) for chunk in iter_json(value))
+
+
+def truncate_chunks(chunks, max_bytes):
+    """
+    Join streamed text chunks until a byte budget is reached.
+
+    Parameters:
+    - chunks (iterable of str): The text, in pieces.
+    - max_bytes (int): Largest UTF-8 size of the result, including the truncation marker.
+
+    Returns:
+    - tuple: The text and whether it was truncated; chunks past the budget are never consumed.
+    """
+    parts, size = [], 0
+    for chunk in chunks:
+        data = chunk.encode("utf-8")
+        if size + len(data) > max_bytes:
+            marker = f"...[truncated to {max_bytes} bytes]"
+            parts.append(data[:max(0, max_bytes - size - len(marker))].decode("utf-8", errors="ignore"))
+            parts.append(marker)
+            return "".join(parts), True
+        parts.append(chunk)
+        size += len(data)
+    return "".join(parts), False
+
+
+def get_max_bytes(spec):
+    if "max_bytes" in spec:
+        return spec["max_bytes"]
+    if "max_tokens" in spec:
+        return spec["max_tokens"] * bytes_per_token
+    return default_max_bytes
+
+
+def shape_tool_output(tool_name, output, specs=None):
+    """
+    Serialize a tool's result compactly, keeping only its configured fields and truncating it to its budget.
+
+    Parameters:
+    - tool_name (str): The tool that produced the output.
+    - output: The tool's return value (str, dict, list, DataFrame or anything json can fall back to str() for).
+    - specs (dict, optional): Per-tool fields and budgets; defaults to tool_output_specs.
+
+    Returns:
+    - str: The tool output to submit to the run.
+    """
+    spec = (tool_output_specs if specs is None else specs).get(tool_name, {})
+    max_bytes = get_max_bytes(spec)
+    shaped_output, truncated = truncate_chunks(iter_json(output, compile_fields(spec.get("fields"))), max_bytes)
+    if logger.isEnabledFor(logging.INFO):
+        logger.info("%s output shaped from %d to %d bytes%s", tool_name, measure_size(output), len(shaped_output.encode("utf-8")), " (truncated)" if truncated else "")
+    return shaped_output
@@ -0,0 +1,162 @@
+import re
+import json
+import types
+import typing
+import inspect
+import functools
+
+
+json_types = {str: "string", int: "integer", float: "number", bool: "boolean", list: "array", tuple: "array", dict: "object"}
+# Types named in the docstrings' "- name (type): description" lines, for parameters without a type hint
+docstring_types = {"str": "string", "int": "integer", "float": "number", "bool": "boolean", "list": "array", "dict": "object"}
+parameter_pattern = re.compile(r"^\s*-\s*(\w+)\s*\(([^)]*)\):\s*(.+)$")
+
+
+def parse_docstring(function):
+    """
+    Read a method's summary and parameter lines, in the repo's "Parameters:" docstring layout.
+
+    Parameters:
+    - function (function): The method.
+
+    Returns:
+    - tuple: The summary paragraph and {name: (type text, description)} for each documented parameter.
+    """
+    docstring = inspect.getdoc(function) or ""
+    summary = " ".join(docstring.split("\n\n")[0].split())
+    if summary.startswith("Parameters:") or summary.startswith("Returns:"):
+        summary = ""
+    parameters = {}
+    for line in docstring.splitlines():
+        match = parameter_pattern.match(line)
+        if match:
+            parameters[match.group(1)] = (match.group(2).split(",")[0].strip(), match.group(3).strip())
+    return summary, parameters
+
+
+def get_json_schema(hint):
+    # Optional[X] and X | None describe X; the model leaves out optional arguments rather than sending null
+    if typing.get_origin(hint) in (typing.Union, types.UnionType):
+        hint = next(arg for arg in typing.get_args(hint) if arg is not type(None))
+    origin = typing.get_origin(hint) or hint
+    schema = {"type": json_types.get(origin, "string")}
+    if schema["type"] == "array":
+        item_hints = typing.get_args(hint)
+        schema["items"] = get_json_schema(item_hints[0]) if item_hints else {"type": "string"}
+    return schema
+
+
+def build_schema(function, name=None, description=None):
+    """
+    Derive a function tool definition from a method's signature, type hints and docstring.
+
+    Parameters:
+    - function (function): The method; self is skipped.
+    - name (str, optional): The tool name; defaults to the method name.
+    - description (str, optional): The tool description; defaults to the docstring summary.
+
+    Returns:
+    - dict: The {"type": "function", "function": {...}} tool definition.
+    """
+    summary, documented = parse_docstring(function)
+    hints = typing.get_type_hints(function)
+    properties, required = {}, []
+    for parameter in list(inspect.signature(function).parameters.values())[1:]:
+        if parameter.kind in (parameter.VAR_POSITIONAL, parameter.VAR_KEYWORD):
+            continue
+        type_text, parameter_description = documented.get(parameter.name, ("", ""))
+        if parameter.name in hints:
+            schema = get_json_schema(hints[parameter.name])
+        elif type_text in docstring_types:
+            schema = {"type": docstring_types[type_text]}
+        elif parameter.default is not parameter.empty and parameter.default is not None:
+            schema = get_json_schema(type(parameter.default))
+        else:
+            schema = {"type": "string"}
+        if schema["type"] == "array" and "items" not in schema:
+            schema["items"] = {"type": "string"}
+        if parameter_description:
+            schema["description"] = parameter_description
+        properties[parameter.name] = schema
+        if parameter.default is parameter.empty:
+            required.append(parameter.name)
+    return {"type": "function", "function": {"name": name or function.__name__, "description": description or summary,
+                                             "parameters": {"type": "object", "properties": properties, "required": required}}}
+
+
+class ToolRegistry:
+    def __init__(self):
+        """
+        Collect a Tools class's function tools: their schemas, built once when the class is defined, and the methods that serve them.
+        """
+        self.entries = {}
+        self.schemas = None
+        self.payload = None
+
+    def tool(self, name=None, description=None):
+        """
+        Register a method as a function tool, deriving its schema from its signature and docstring.
+
+        Parameters:
+        - name (str, optional): The tool name; defaults to the method name.
+        - description (str, optional): The tool description; defaults to the docstring summary.
+
+        Returns:
+        - function: The decorator, which returns the method unchanged.
+        """
+        def register(function):
+            schema = build_schema(function, name, description)
+            self.add_schema(schema, function.__name__)
+            return function
+        return register
+
+    def add_schema(self, schema, method_name, **arguments):
+        """
+        Register a tool whose schema is already written, e.g. an ACORD form tool from assets/acord.
+
+        Parameters:
+        - schema (dict): The tool definition, with or without the {"type": "function"} wrapper.
+        - method_name (str): The method that serves the tool.
+        - arguments: Fixed keyword arguments passed to the method along with the tool call's arguments.
+        """
+        if "function" not in schema:
+            schema = {"type": "function", "function": schema}
+        tool_name = schema["function"]["name"]
+        if tool_name in self.entries:
+            raise ValueError(f"Tool {tool_name} is already registered")
+        self.entries[tool_name] = {"schema": schema, "method_name": method_name, "arguments": arguments}
+        self.schemas = None
+        self.payload = None
+
+    def get_schemas(self):
+        """
+        Get the tool definitions in registration order, for an assistant's tools.
+
+        Returns:
+        - list: The shared, pre-built definitions; callers must not modify them.
+        """
+        if self.schemas is None:
+            self.schemas = [entry["schema"] for entry in self.entries.values()]
+        return self.schemas
+
+    def get_payload(self):
+        # The definitions serialized once, so every assistant update sends, and can be compared by, the same bytes
+        if self.payload is None:
+            self.payload = json.dumps(self.get_schemas(), separators=(",", ":"))
+        return self.payload
+
+    def get_tool_functions(self, tools):
+        """
+        Build the dispatch table for one Tools instance.
+
+        Parameters:
+        - tools: The instance whose methods serve the registered tools.
+
+        Returns:
+        - dict: By tool name, a callable taking the tool call's arguments as keywords.
+        """
+        tool_functions = {}
+        for tool_name, entry in self.entries.items():
+            method = getattr(tools, entry["method_name"])
+            tool_functions[tool_name] = functools.partial(method, **entry["arguments"]) if entry["arguments"] else method
+        return tool_functions
@@ -0,0 +1,133 @@
+import time
+import numbers
+import hashlib
+import threading
+import numpy as np
+from collections import OrderedDict
+
+
+def hash_rows(units):
+    # Folds each record's bytes into one 64-bit hash, so a fleet is put in canonical order by sorting integers rather than records
+    if units.dtype.itemsize % 8:
+        return np.sort(units.view(f"V{units.dtype.itemsize}")).tobytes()
+    words = np.ascontiguousarray(units).view(np.uint64).reshape(len(units), -1)
+    row_hashes = np.full(len(units), 0xcbf29ce484222325, dtype=np.uint64)
+    for column in words.T:
+        row_hashes = (row_hashes ^ column) * np.uint64(0x100000001b3)
+        row_hashes ^= row_hashes >> np.uint64(29)
+    return np.sort(row_hashes).tobytes()
+
+
+def canonicalize(value):
+    """
+    Encode submitted underwriting data as canonical text, so equivalent submissions produce the same cache key.
+
+    Parameters:
+    - value: A submitted value (dict, list, number, string, None or a structured fleet array).
+
+    Returns:
+    - str: Dicts with sorted keys, lists with sorted items, and integral floats written as ints.
+    """
+    value_type = type(value)
+    if value_type is str or value_type is int or value_type is bool or value is None:
+        return repr(value)
+    if value_type is float:
+        return repr(int(value)) if value.is_integer() else repr(value)
+    if value_type is dict:
+        return "{" + ",".join(sorted([repr(str(key)) + ":" + canonicalize(item) for key, item in value.items()])) + "}"
+    if value_type is list or value_type is tuple:
+        # Claims, vehicles, drivers and other collections are scored item by item and summed, so their order never matters
+        return "[" + ",".join(sorted(map(canonicalize, value))) + "]"
+    if isinstance(value, np.ndarray):
+        return f"<{value.dtype.descr}:{hashlib.blake2b(hash_rows(value), digest_size=16).hexdigest()}>"
+    if isinstance(value, numbers.Integral):
+        return repr(int(value))
+    if isinstance(value, numbers.Real):
+        return canonicalize(float(value))
+    return repr(repr(value))
+
+
+class UnderwritingCache:
+    def __init__(self, maxsize=1024, ttl=3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.rules_version = None
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def get_key(self, form_number, submission, rules_version, explain=False):
+        """
+        Build the cache key for one underwriting call.
+
+        Parameters:
+        - form_number (str): The ACORD form number.
+        - submission (dict): The submitted fields the rating table reads.
+        - rules_version (str): The rating-table version and digest the result is computed under.
+        - explain (bool): Whether the result carries a score breakdown.
+
+        Returns:
+        - str: A stable hex digest of the canonicalized arguments and rules version.
+        """
+        canonical = f"{form_number}|{rules_version}|{bool(explain)}|{canonicalize(submission)}"
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest()
+
+    def check_rules_version(self, rules_version):
+        # Results from older rating tables can never be hit again, so they are dropped as soon as the rules change
+        if rules_version != self.rules_version:
+            with self.lock:
+                self.entries.clear()
+                self.rules_version = rules_version
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] < self.ttl:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return dict(entry[1])
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+
+    def set(self, key, underwriting):
+        with self.lock:
+            underwriting = dict(underwriting)
+            for value in underwriting.values():
+                if isinstance(value, np.ndarray):
+                    # Every hit shares the cached arrays (e.g. explain contributions), so they are frozen
+                    value.flags.writeable = False
+            self.entries[key] = (time.monotonic(), underwriting)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def get_or_compute(self, key, compute):
+        underwriting = self.get(key)
+        if underwriting is None:
+            underwriting = compute()
+            self.set(key, underwriting)
+        return underwriting
+
+    def get_stats(self):
+        """
+        Report cache effectiveness.
+
+        Returns:
+        - dict: hits, misses, hit_rate, size and maxsize.
+        """
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hits / lookups if lookups else 0.0, "size": len(self.entries), "maxsize": self.maxsize}
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# Shared by every AccordForm instance in the process
+underwriting_cache = UnderwritingCache()
@@ -0,0 +1,76 @@
+import requests
+import pandas as pd
+from functools import lru_cache
+from urllib.parse import urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from classes import rate_limiter_class
+
+
+default_headers = {
+    'Accept': 'application/json',
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Accept-Encoding': 'gzip, deflate, br'
+}
+# Yelp returns 20 results per search page; the page URL takes the offset of its first result
+page_size = 20
+
+
+class YelpFetcher:
+    def __init__(self, base_url, headers=None, max_workers=4, requests_per_second=4.0, timeout=20):
+        """
+        Fetch Yelp search pages concurrently over one pooled HTTP session.
+
+        Parameters:
+        - base_url (str): Search URL template with {query}, {postalcode} and {i} (the result offset).
+        - headers (dict, optional): Request headers; defaults to browser-like headers.
+        - max_workers (int): Pages fetched at once, and connections kept per host.
+        - requests_per_second (float): Request starts allowed per host.
+        - timeout (float): Seconds before a page request is abandoned.
+        """
+        self.base_url = base_url
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update(headers or default_headers)
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="yelp")
+        self.rate_limiter = rate_limiter_class.HostRateLimiter(requests_per_second)
+
+    def fetch_page(self, url):
+        self.rate_limiter.wait(urlsplit(url).netloc)
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException as e:
+            return [url, None, str(e), None]
+        try:
+            response_json = response.json()
+        except ValueError:
+            response_json = None
+        return [url, response.status_code, response.text, response_json]
+
+    def fetch_pages(self, query, postalcode, start_page, num_pages):
+        """
+        Fetch consecutive Yelp search result pages.
+
+        Parameters:
+        - query (str): The search term for Yelp.
+        - postalcode (str): The postal code for the search location.
+        - start_page (int): The offset of the first result to fetch.
+        - num_pages (int): The number of pages to fetch.
+
+        Returns:
+        - pd.DataFrame: One row per page in page order, with columns URL, Response Status, Response Text and Response JSON;
+          a page whose request failed has no status and the error as its text.
+        """
+        urls = [self.base_url.format(query=query, postalcode=postalcode, i=i) for i in range(start_page, start_page + num_pages * page_size, page_size)]
+        rows = list(self.pool.map(self.fetch_page, urls))
+        return pd.DataFrame(rows, columns=['URL', 'Response Status', 'Response Text', 'Response JSON'])
+
+
+@lru_cache(maxsize=None)
+def get_yelp_fetcher(base_url):
+    # Shared process-wide, so every session reuses the same connections and stays under the same rate limit
+    return YelpFetcher(base_url)
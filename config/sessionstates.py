@@ -1,6 +1,7 @@
 import streamlit as st
 from supabase import create_client
 from openai import OpenAI
+from masterclasses import client_class
 
 def initialize_session_states():
     if 'user' not in st.session_state:
@@ -40,8 +41,8 @@ def initialize_session_states():
             'createddate_column': st.secrets.supabase.createddate_column,
             'businessname_column': st.secrets.supabase.businessname_column,
             'businessaddress_column': st.secrets.supabase.businessaddress_column,
-            'supabase_client': create_client(supabase_url=st.secrets.supabase.url, supabase_key=st.secrets.supabase.api_key_admin),
-            'openai_client': OpenAI(api_key=st.secrets.openai.api_key),
+            'supabase_client': client_class.get_supabase_client(),
+            'openai_client': client_class.get_openai_client(),
             'users_table': st.secrets.supabase.users_table,
             'existing_user_select_string': f"{st.secrets.supabase.username_column}, {st.secrets.supabase.password_column}, {st.secrets.supabase.vstoreid_column}, {st.secrets.supabase.threadid_column}, {st.secrets.supabase.userrole_column}, {st.secrets.supabase.firstname_column}, {st.secrets.supabase.lastname_column}, {st.secrets.supabase.fullname_column}, {st.secrets.supabase.createddate_column}, {st.secrets.supabase.businessname_column}, {st.secrets.supabase.businessaddress_column}"
 }
@@ -1,30 +1,71 @@
 import streamlit as st
 from openai import OpenAI as oaiClient
 from tavily import TavilyClient as tavClient
-from simple_salesforce import Salesforce as sfdcClient
 from googlemaps import Client as gClient
 from supabase import create_client as supaClient
+from classes.client_registry_class import client_registry
+from classes.salesforce_connector_class import SalesforceConnector
+
+
+def get_openai_client():
+    return client_registry.get_client("openai", oaiClient, api_key=st.secrets.openai.api_key, base_url=st.secrets.openai.get("base_url"))
+
+
+def get_salesforce_client():
+    # The connector logs in on its first query, not here
+    return client_registry.get_client("salesforce", SalesforceConnector, username=st.secrets.salesforce.username, password=st.secrets.salesforce.password, security_token=st.secrets.salesforce.security_token)
+
+
+def get_supabase_client():
+    return client_registry.get_client("supabase", supaClient, supabase_key=st.secrets.supabase.api_key_admin, supabase_url=st.secrets.supabase.url)
+
+
+def get_tavily_client():
+    return client_registry.get_client("tavily", tavClient, api_key=st.secrets.tavily.api_key)
+
+
+def get_google_client():
+    return client_registry.get_client("google", gClient, key=st.secrets.google.api_key)
+
+
+def get_google_maps_client():
+    # The tool classes read their Google key from the googleconfig secrets rather than google
+    return client_registry.get_client("google_maps", gClient, key=st.secrets.googleconfig.maps_api_key)
 
 
 class Clients:
-    def __init__(self):
-        self.openai_client = oaiClient(api_key=st.secrets.openai.api_key)
-        self.salesforce_client  = sfdcClient(username=st.secrets.salesforce.username, password=st.secrets.salesforce.password, security_token=st.secrets.salesforce.security_token)
-        self.supabase_client = supaClient(supabase_key=st.secrets.supabase.api_key_admin, supabase_url=st.secrets.supabase.url)
-        self.tavily_client = tavClient(api_key=st.secrets.tavily.api_key)
-        self.google_client = gClient(key=st.secrets.google.api_key)
+    # Each client is taken from the process-wide registry when first used, instead of being built per instance
+    @property
+    def openai_client(self):
+        return get_openai_client()
+
+    @property
+    def salesforce_client(self):
+        return get_salesforce_client()
+
+    @property
+    def supabase_client(self):
+        return get_supabase_client()
+
+    @property
+    def tavily_client(self):
+        return get_tavily_client()
+
+    @property
+    def google_client(self):
+        return get_google_client()
 
     def get_openai_client(self):
         return self.openai_client
-    
+
     def get_salesforce_client(self):
         return self.salesforce_client
-    
+
     def get_supabase_client(self):
         return self.supabase_client
-    
+
     def get_tavily_client(self):
         return self.tavily_client
-    
+
     def get_google_client(self):
         return self.google_client
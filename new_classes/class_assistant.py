@@ -2,6 +2,7 @@ import streamlit as st
 from openai import OpenAI
 from datetime import datetime
 from new_classes import class_chathistory, class_messages
+from masterclasses import client_class
 
 
 
@@ -13,7 +14,7 @@ class Assistant:
         self.initialize_chathistory()
 
     def initialize_openai(self):
-        self.openai_client = OpenAI(api_key=st.secrets.openai.api_key)
+        self.openai_client = client_class.get_openai_client()
         self.assistant_id = st.secrets.openai.assistant_id
         self.thread_id = st.session_state.thread_id
 
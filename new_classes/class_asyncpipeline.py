@@ -0,0 +1,171 @@
+import asyncio
+import threading
+import streamlit as st
+from openai import AsyncOpenAI
+from classes import client_registry_class
+
+
+def format_thread_message_content(content, image_urls=None, image_file_ids=None):
+    if not image_urls and not image_file_ids:
+        return content
+    thread_message_content = [{"type": "text", "text": content}]
+    for image_url in image_urls or []:
+        thread_message_content.append({"type": "image_url", "image_url": {"url": image_url, "detail": "auto"}})
+    for image_file_id in image_file_ids or []:
+        thread_message_content.append({"type": "image_file", "image_file": {"file_id": image_file_id, "detail": "auto"}})
+    return thread_message_content
+
+
+def format_thread_message_attachments(attachment_file_ids=None):
+    if attachment_file_ids is None:
+        return None
+    return [{"file_id": file_id, "tools": [{"type": "code_interpreter"}]} for file_id in attachment_file_ids]
+
+
+class ChatPipeline:
+    def __init__(self, openai_client):
+        """
+        Run the chat's OpenAI calls on a background event loop, so independent requests overlap.
+        The sync methods block the calling (Streamlit script) thread until their requests finish.
+
+        Parameters:
+        - openai_client (AsyncOpenAI): The async OpenAI client; it is only ever used on the pipeline's loop.
+        """
+        self.openai_client = openai_client
+        self.pending = set()
+        self.loop = asyncio.new_event_loop()
+        self.loop_thread = threading.Thread(target=self.run_loop, name="chat-pipeline", daemon=True)
+        self.loop_thread.start()
+
+    def run_loop(self):
+        self.loop.run_forever()
+        self.loop.close()
+
+    def run(self, coroutine):
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.loop)
+        self.pending.add(future)
+        future.add_done_callback(self.pending.discard)
+        return future.result()
+
+    async def close_async(self):
+        # Requests other sessions already started on this pipeline finish before the client and loop go away
+        await asyncio.gather(*[asyncio.wrap_future(future) for future in list(self.pending)], return_exceptions=True)
+        await self.openai_client.close()
+
+    def close(self):
+        """
+        Stop the pipeline once its in-flight requests finish, without waiting for them.
+
+        Returns:
+        - Future: Done when the client is closed; the loop thread exits right after.
+        """
+        future = asyncio.run_coroutine_threadsafe(self.close_async(), self.loop)
+        # Stopped only once the future is resolved, so a caller waiting on it is always woken
+        future.add_done_callback(lambda future: self.loop.call_soon_threadsafe(self.loop.stop))
+        return future
+
+    async def upload_file_async(self, file_path, purpose):
+        with open(file=file_path, mode="rb") as file:
+            openai_file = await self.openai_client.files.create(file=file, purpose=purpose)
+        return openai_file.id
+
+    async def create_thread_message_async(self, thread_id, role, content, image_urls=None, image_paths=None, file_paths=None):
+        # Vision images and attachments are uploaded concurrently; the message needs all of their file ids
+        image_paths = image_paths or []
+        file_ids = await asyncio.gather(*[self.upload_file_async(image_path, "vision") for image_path in image_paths],
+                                        *[self.upload_file_async(file_path, "assistants") for file_path in file_paths or []])
+        thread_message_content = format_thread_message_content(content, image_urls, file_ids[:len(image_paths)])
+        thread_message_attachments = format_thread_message_attachments(file_ids[len(image_paths):] if file_paths is not None else None)
+        return await self.openai_client.beta.threads.messages.create(thread_id=thread_id, role=role, content=thread_message_content, attachments=thread_message_attachments)
+
+    async def get_thread_messages_async(self, thread_id, run_id=None):
+        if run_id is None:
+            return [thread_message async for thread_message in self.openai_client.beta.threads.messages.list(thread_id=thread_id)]
+        return [thread_message async for thread_message in self.openai_client.beta.threads.messages.list(thread_id=thread_id, run_id=run_id)]
+
+    async def get_latest_thread_messages_async(self, thread_id, run_id=None, limit=20):
+        # Awaiting the list call fetches only its first page, so this is always a single request
+        if run_id is None:
+            thread_messages_page = await self.openai_client.beta.threads.messages.list(thread_id=thread_id, limit=limit, order="desc")
+        else:
+            thread_messages_page = await self.openai_client.beta.threads.messages.list(thread_id=thread_id, run_id=run_id, limit=limit, order="desc")
+        return thread_messages_page.data
+
+    async def retrieve_thread_messages_async(self, thread_id, message_ids):
+        return await asyncio.gather(*[self.openai_client.beta.threads.messages.retrieve(message_id=message_id, thread_id=thread_id) for message_id in message_ids])
+
+    async def retrieve_files_async(self, file_ids):
+        return await asyncio.gather(*[self.openai_client.files.retrieve(file_id=file_id) for file_id in file_ids])
+
+    def create_thread_message(self, thread_id, role, content, image_urls=None, image_paths=None, file_paths=None):
+        """
+        Upload the message's files concurrently, then add the message to the thread.
+
+        Parameters:
+        - thread_id (str): The thread to add the message to.
+        - role (str): The message role, e.g. "user".
+        - content (str): The message text.
+        - image_urls (list, optional): Image URLs to include.
+        - image_paths (list, optional): Local images uploaded for vision.
+        - file_paths (list, optional): Local files attached for the code interpreter.
+
+        Returns:
+        - Message: The created thread message.
+        """
+        return self.run(self.create_thread_message_async(thread_id, role, content, image_urls, image_paths, file_paths))
+
+    def get_thread_messages(self, thread_id, run_id=None):
+        """
+        List a thread's messages, newest first, following every page; one request per 20 messages.
+
+        Parameters:
+        - thread_id (str): The thread.
+        - run_id (str, optional): Only the messages of this run.
+
+        Returns:
+        - list: The thread messages.
+        """
+        return self.run(self.get_thread_messages_async(thread_id, run_id))
+
+    def get_latest_thread_messages(self, thread_id, run_id=None, limit=20):
+        """
+        List a thread's newest messages with a single request, for callers that only need the latest reply.
+
+        Parameters:
+        - thread_id (str): The thread.
+        - run_id (str, optional): Only the messages of this run.
+        - limit (int): How many messages to return, at most 100.
+
+        Returns:
+        - list: Up to limit thread messages, newest first.
+        """
+        return self.run(self.get_latest_thread_messages_async(thread_id, run_id, limit))
+
+    def retrieve_thread_messages(self, thread_id, message_ids):
+        """
+        Retrieve several messages of a thread concurrently.
+
+        Parameters:
+        - thread_id (str): The thread.
+        - message_ids (list): The messages to retrieve.
+
+        Returns:
+        - list: The messages, in the order of message_ids.
+        """
+        return self.run(self.retrieve_thread_messages_async(thread_id, message_ids))
+
+    def retrieve_files(self, file_ids):
+        """
+        Retrieve several files' metadata concurrently, e.g. the files a message's annotations cite.
+
+        Parameters:
+        - file_ids (list): The files to retrieve.
+
+        Returns:
+        - list: The files, in the order of file_ids.
+        """
+        return self.run(self.retrieve_files_async(file_ids))
+
+def get_chat_pipeline():
+    # One loop and connection pool per process, shared by every session and rebuilt when the API key rotates
+    return client_registry_class.client_registry.get_client("chat_pipeline", lambda api_key: ChatPipeline(AsyncOpenAI(api_key=api_key)), close=ChatPipeline.close, api_key=st.secrets.openai.api_key)
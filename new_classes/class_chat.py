@@ -14,15 +14,11 @@ import pandas as pd
 import requests
 from googlemaps import Client as gClient, addressvalidation, places, geocoding, geolocation
 from supabase import create_client as supaClient
+from masterclasses import client_class
 
 
-class Clients:
-    def __init__(self):
-        self.openai_client = oaiClient(api_key=st.secrets.openai.api_key)
-        self.salesforce_client  = sfdcClient(username=st.secrets.salesforce.username, password=st.secrets.salesforce.password, security_token=st.secrets.salesforce.security_token)
-        self.supabase_client = supaClient(supabase_key=st.secrets.supabase.api_key_admin, supabase_url=st.secrets.supabase.url)
-        self.tavily_client = tavClient(api_key=st.secrets.tavily.api_key)
-        self.google_client = gClient(key=st.secrets.google.api_key)
+# The clients come from the process-wide registry, shared with every other session
+Clients = client_class.Clients
 
 class Utils:
     def __init__(self):
@@ -1,6 +1,8 @@
 import streamlit as st
 from openai import OpenAI
 from datetime import datetime
+from masterclasses import client_class
+from new_classes import class_asyncpipeline
 
 class ChatHistory:
     def __init__(self):
@@ -9,10 +11,10 @@ class ChatHistory:
         self.initialize_chathistory_messages()
 
     def initialize_openai(self):
-        self.openai_client = OpenAI(api_key=st.secrets.openai.api_key)
+        self.openai_client = client_class.get_openai_client()
         self.assistant_id = st.secrets.openai.assistant_id
         self.thread_id = st.session_state.thread_id
-        self.thread_messages = self.openai_client.beta.threads.messages.list(thread_id=self.thread_id)
+        self.thread_messages = class_asyncpipeline.get_chat_pipeline().get_thread_messages(self.thread_id)
 
     def initialize_message_template(self):
         self.message_template = st.session_state.message_template
@@ -26,7 +28,7 @@ class ChatHistory:
             self.update_sessionstate()
 
     def add_chathistory_message(self, messageid):
-        thread_message = self.openai_client.beta.threads.messages.retrieve(message_id=messageid, thread_id=self.thread_id)
+        thread_message = class_asyncpipeline.get_chat_pipeline().retrieve_thread_messages(self.thread_id, [messageid])[0]
         new_message = self.message_template
         new_message.update({"username": st.session_state.username, "businessid": st.session_state.businses_id, "assistantid": st.secrets.openai.assistant_id, "threadid": self.thread_id, "runid": thread_message.run_id, "messageid": thread_message.id, "messagerole": thread_message.role, "messagecontent": thread_message.content[0].text.value, "createdatunix": thread_message.created_at, "createdatdatetime": datetime.fromtimestamp(thread_message.created_at).strftime('%Y-%m-%d %H:%M:%S') })
         self.chathistory_messages.append(new_message)
@@ -1,5 +1,6 @@
 import streamlit as st
 from new_classes import class_chathistory
+from masterclasses import client_class
 from simple_salesforce import Salesforce as sfdcClient
 from supabase import create_client as supaClient
 from openai import OpenAI as oaiClient
@@ -40,8 +41,9 @@ class SessionState:
         st.session_state.request_headers = {'Accept': 'application/json', 'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36', 'Accept-Language': 'en-US,en;q=0.9','Accept-Encoding': 'gzip, deflate, br'}
 
     def initialize_clients(self):
-        st.session_state.google_client = gClient(key=st.secrets.google.api_key)
-        st.session_state.salesforce_client = sfdcClient(username=st.secrets.salesforce.username, password=st.secrets.salesforce.password, security_token=st.secrets.salesforce.security_token)
-        st.session_state.tavily_client = tavClient(api_key=st.secrets.tavily.api_key)
-        st.session_state.openai_client = oaiClient(api_key=st.secrets.openai.api_key)
-        st.session_state.supabase_client = supaClient(supabase_key=st.secrets.supabase.api_key_admin, supabase_url=st.secrets.supabase.url)
+        # Session state only references the process-wide clients, so a new session does not build or log in again
+        st.session_state.google_client = client_class.get_google_client()
+        st.session_state.salesforce_client = client_class.get_salesforce_client()
+        st.session_state.tavily_client = client_class.get_tavily_client()
+        st.session_state.openai_client = client_class.get_openai_client()
+        st.session_state.supabase_client = client_class.get_supabase_client()
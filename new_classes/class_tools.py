@@ -16,12 +16,17 @@ import json
 import time
 import requests
 from googlemaps import Client as gClient, addressvalidation, places, geocoding, geolocation
+from classes import yelp_fetcher_class, tool_cache_class, soql_stream_class, code_sandbox_class, geocode_batch_class, spatial_index_class, tool_registry_class, acord_form_class_all
+from masterclasses import client_class
+
+# Schemas are derived from the registered methods' signatures and docstrings when the class is defined
+tool_registry = tool_registry_class.ToolRegistry()
 
 class Tools:
     def __init__(self):
-        self.salesforce_client = Salesforce(username=st.secrets.salesforce.username, password=st.secrets.salesforce.password, security_token=st.secrets.salesforce.security_token)
-        self.tavily_client = TavilyClient(api_key=st.secrets.tavily.api_key)
-        self.google_client = gClient(key=st.secrets.googleconfig.maps_api_key)
+        self.salesforce_client = client_class.get_salesforce_client()
+        self.tavily_client = client_class.get_tavily_client()
+        self.google_client = client_class.get_google_maps_client()
         self.headers = {
             'Accept': 'application/json',
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36',
@@ -30,50 +35,25 @@ class Tools:
         }
         self.yelp_base_url = st.secrets.urlconfig.yelp_search_url
     
-    def fetch_yelp_data(self, query, postalcode, start_page, num_pages):
+    @tool_registry.tool()
+    def fetch_yelp_data(self, query: str, postalcode: str, start_page: int, num_pages: int):
         """
         Fetch data from Yelp search results.
 
         Parameters:
         - query (str): The search term for Yelp.
         - postalcode (str): The postal code for the search location.
-        - start_page (int): The starting page number.
+        - start_page (int): The offset of the first result to fetch.
         - num_pages (int): The number of pages to fetch.
 
         Returns:
-        - pd.DataFrame: A dataframe with columns URL, Response Status, Response Text, and Response JSON.
+        - pd.DataFrame: A dataframe with columns URL, Response Status, Response Text, and Response JSON, one row per page.
         """
-        # Initialize an empty dataframe
-        results_df = pd.DataFrame(columns=['URL', 'Response Status', 'Response Text', 'Response JSON'])
-        
-        # Loop through the specified number of pages
-        for i in range(start_page, start_page + num_pages * 20, 20):
-            # Construct the URL using the base URL from secrets
-            url = self.yelp_base_url.format(query=query, postalcode=postalcode, i=i)
-            
-            # Make the request
-            response = requests.get(url, headers=self.headers)
-            
-            # Collect the response details
-            response_status = response.status_code
-            response_text = response.text
-            try:
-                response_json = response.json()
-            except ValueError:
-                response_json = None
-            
-            # Append to the dataframe
-            new_row = pd.DataFrame([{
-                'URL': url,
-                'Response Status': response_status,
-                'Response Text': response_text,
-                'Response JSON': response_json
-            }])
-            results_df = pd.concat([results_df, new_row], ignore_index=True)
-        
-        return results_df
+        # Pages are fetched concurrently over a pooled session shared by every Tools instance
+        return yelp_fetcher_class.get_yelp_fetcher(self.yelp_base_url).fetch_pages(query, postalcode, start_page, num_pages)
 
-    def search_tavily(self, query: str = None):
+    @tool_registry.tool()
+    def search_tavily(self, query: str):
         """
         Searches for information using the TavilyClient.
 
@@ -81,35 +61,120 @@ class Tools:
         - query (str): The search query string.
 
         Returns:
-        - dict: The search response containing results, raw content, and answer if applicable.
+        - dict: The search response containing results and answer if applicable.
         """
-        include_raw_content = True
+        include_raw_content = False
         max_results = 10
         include_answer = True
         search_depth = "advanced"
         
-        # Perform the search with the given parameters
-        search_response = self.tavily_client.search(
+        # Perform the search with the given parameters; repeated searches are answered from the shared tool cache
+        search_response = tool_cache_class.get_tool_cache().get_or_fetch("search_tavily", {"query": query}, lambda: self.tavily_client.search(
             query=query, 
             search_depth=search_depth, 
             include_raw_content=include_raw_content, 
             include_answer=include_answer
-        )
+        ))
         
         return search_response
 
-    def validate_address(self, address_lines):
-        self.address_validation_response = addressvalidation.addressvalidation(client=self.google_client, addressLines=address_lines, regionCode="US", enableUspsCass=True)
-        # print(self.addvalidate)
-        # ['1840 Coralito Ln', 'Elgin, IL 60124']
-    
-    def get_geocode(self, address_lines):
-        self.address_geocode_response = geocoding.geocode(client=self.google_client, address=address_lines, region="US")
+    @tool_registry.tool()
+    def validate_address(self, address_lines: list[str]):
+        """
+        Validate a US address with the Google Address Validation API.
+
+        Parameters:
+        - address_lines (list): The address lines, e.g. ["1840 Coralito Ln", "Elgin, IL 60124"].
+
+        Returns:
+        - dict: The validation response, with the verdict, the standardized address and its geocode.
+        """
+        self.address_validation_response = tool_cache_class.get_tool_cache().get_or_fetch("validate_address", {"address_lines": address_lines}, lambda: addressvalidation.addressvalidation(client=self.google_client, addressLines=address_lines, regionCode="US", enableUspsCass=True))
+        return self.address_validation_response
+
+    @tool_registry.tool()
+    def get_geocode(self, address_lines: list[str]):
+        """
+        Geocode a US address with the Google Geocoding API.
+
+        Parameters:
+        - address_lines (list): The address lines, e.g. ["1840 Coralito Ln", "Elgin, IL 60124"].
+
+        Returns:
+        - list: The geocoding results, with the formatted address, place_id and lat/lng of each match.
+        """
+        self.address_geocode_response = tool_cache_class.get_tool_cache().get_or_fetch("get_geocode", {"address_lines": address_lines}, lambda: geocoding.geocode(client=self.google_client, address=address_lines, region="US"))
+        # Every geocoded address is kept for the accumulation-of-risk lookups
+        spatial_index = spatial_index_class.get_spatial_index()
+        if spatial_index_class.index_geocode_response(spatial_index, self.address_geocode_response):
+            spatial_index.schedule_save()
+        return self.address_geocode_response
+
+    @tool_registry.tool()
+    def geocode_addresses(self, addresses: list[str]):
+        """
+        Validate and geocode a schedule of addresses, e.g. the locations of an ACORD 140 submission.
+
+        Parameters:
+        - addresses (list): Each address as a string or a list of address lines.
+
+        Returns:
+        - DataFrame: One row per address with lat, lng, place_id, verdict and confidence.
+        """
+        self.batch_geocode_response = geocode_batch_class.get_geocode_pipeline(self.google_client).geocode_addresses(addresses)
+        spatial_index = spatial_index_class.get_spatial_index()
+        if spatial_index_class.index_locations(spatial_index, self.batch_geocode_response):
+            spatial_index.schedule_save()
+        return self.batch_geocode_response
+
+    @tool_registry.tool()
+    def find_nearby_locations(self, lat: float, lng: float, radius_miles: float = 5.0):
+        """
+        Find the geocoded locations within a distance of a point, e.g. to check accumulation of risk.
+
+        Parameters:
+        - lat (float): Latitude in degrees.
+        - lng (float): Longitude in degrees.
+        - radius_miles (float): Distance in miles.
+
+        Returns:
+        - DataFrame: id, label, lat, lng and distance_miles of each location, nearest first.
+        """
+        self.nearby_locations_response = spatial_index_class.get_spatial_index().query_radius(lat, lng, radius_miles)
+        return self.nearby_locations_response
+
+    @tool_registry.tool()
+    def find_nearest_locations(self, lat: float, lng: float, k: int = 5):
+        """
+        Find the k geocoded locations nearest to a point.
 
-    def places_search(self, query):
-        self.places_search_response = places.places(client=self.google_client, query=query, region="US")
+        Parameters:
+        - lat (float): Latitude in degrees.
+        - lng (float): Longitude in degrees.
+        - k (int): Locations to return.
+
+        Returns:
+        - DataFrame: id, label, lat, lng and distance_miles of each location, nearest first.
+        """
+        self.nearest_locations_response = spatial_index_class.get_spatial_index().query_nearest(lat, lng, k)
+        return self.nearest_locations_response
+
+    @tool_registry.tool()
+    def places_search(self, query: str):
+        """
+        Search Google Places for businesses or places matching a text query.
+
+        Parameters:
+        - query (str): The text query, e.g. "Jewel Osco Elgin IL".
+
+        Returns:
+        - dict: The places search response.
+        """
+        self.places_search_response = tool_cache_class.get_tool_cache().get_or_fetch("places_search", {"query": query}, lambda: places.places(client=self.google_client, query=query, region="US"))
+        return self.places_search_response
 
-    def execute_soql_query(self, query):
+    @tool_registry.tool(description="Execute a SOQL query in Salesforce and return the results")
+    def execute_soql_query(self, query: str):
         """
         Execute a SOQL query and return the results.
 
@@ -117,15 +182,15 @@ class Tools:
         - query (str): The SOQL query to be executed.
 
         Returns:
-        - dict: The query results or an error message.
+        - DataFrame: The records' selected fields, or a dict with an error message.
         """
         try:
-            response = self.sf.query_all(query)
-            return response['records']
+            return soql_stream_class.query_frame(self.salesforce_client, query)
         except Exception as e:
             return {"error": str(e)}
 
-    def execute_python_code(self, code):
+    @tool_registry.tool(description="Use this function to execute the generated code which requires internet access or external API access")
+    def execute_python_code(self, code: str):
         """
         Execute the provided Python code.
 
@@ -133,112 +198,43 @@ class Tools:
         - code (str): The Python code to be executed.
 
         Returns:
-        - dict: The result of the code execution or an error message.
+        - str: JSON of the variables the code defined and what it printed, or of an error message.
         """
-        try:
-            exec_globals = {}
-            exec(code, exec_globals)
-            return {"result": exec_globals}
-        except Exception as e:
-            return {"error": str(e)}
+        return code_sandbox_class.get_code_sandbox().execute(code)
+
+    def underwrite_acord_form(self, form_number, **arguments):
+        """
+        Validate an ACORD form tool call's arguments, then underwrite the submission.
+
+        Parameters:
+        - form_number (str): The ACORD form number, e.g. "140".
+        - arguments: The tool call's arguments, checked against the form's schema in assets/acord.
+
+        Returns:
+        - dict: The underwriting decision with its risk score and the points each factor contributed.
+        """
+        form = acord_form_class_all.get_form_class(form_number)()
+        form.submit_tool_arguments(arguments)
+        # Assistants re-ask with the same arguments across turns and retried runs, so those calls hit the shared cache
+        return form.underwrite(explain=True, use_cache=True)
+
+    def get_tool_functions(self):
+        return tool_registry.get_tool_functions(self)
 
     def get_openai_json_schema(self):
         """
         Returns the OpenAI JSON schema list for each tool.
 
         Returns:
-        - list: A list of schemas for each tool.
+        - list: A list of schemas for each tool, built once when the module is imported.
         """
-        return [
-            {
-                "type": "function",
-                "function": {
-                    "name": "fetch_yelp_data",
-                    "description": "Fetch data from Yelp search results",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "The search term for Yelp"
-                            },
-                            "postalcode": {
-                                "type": "string",
-                                "description": "The postal code for the search location"
-                            },
-                            "start_page": {
-                                "type": "integer",
-                                "description": "The starting page number"
-                            },
-                            "num_pages": {
-                                "type": "integer",
-                                "description": "The number of pages to fetch"
-                            }
-                        },
-                        "required": ["query", "postalcode", "start_page", "num_pages"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "search_tavily",
-                    "description": "Searches for information using the TavilyClient",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "The search query string"
-                            }
-                        },
-                        "required": ["query"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "execute_soql_query",
-                    "description": "Execute a SOQL query in Salesforce and return the results",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "query": {
-                                "type": "string",
-                                "description": "The SOQL query to be executed"
-                            }
-                        },
-                        "required": ["query"]
-                    }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "execute_python_code",
-                    "description": "Use this function to execute the generated code which requires internet access or external API access",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "code": {
-                                "type": "string",
-                                "description": "The python code generated by the code interpreter"
-                            }
-                        },
-                        "required": ["code"]
-                    }
-                }
-            }
-        ]
-    
-a = Tools()
-#b = a.validate_address()
-#b = a.get_geocode(address_lines=['1840 Coralito Ln', 'Elgin, IL 60124'])
-# b = a.places_search(query="Jewel Osco Elgin IL")
-# print(a.places_search_response)
+        return tool_registry.get_schemas()
+
+
+# The ACORD underwriting tools keep their hand-written schemas from assets/acord
+for form_number in acord_form_class_all.tool_form_numbers:
+    tool_registry.add_schema(acord_form_class_all.get_form_tool(form_number), "underwrite_acord_form", form_number=form_number)
 
-print(a.search_tavily(query="What year was the Jewel Osco in South Elgin built? How old is its roof?"))
 
 
 